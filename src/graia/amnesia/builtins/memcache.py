@@ -1,48 +1,523 @@
 import asyncio
+import sys
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Mapping
 from datetime import timedelta
-from heapq import heappop, heappush
+from heapq import heapify, heappop, heappush
 from time import time
-from typing import Any
+from typing import Any, Literal
 
 from launart import Launart, Service
 from launart.status import Phase
+from launart.utilles import any_completed
+
+EvictionPolicy = Literal["lru", "lfu", "tinylfu"]
+
+
+def _sizeof(key: str, value: Any) -> int:
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+def _consume(task: asyncio.Task[Any]) -> None:
+    # 后台刷新可能无人等待, 取出异常以免事件循环报告 "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class MemcacheStats:
+    """缓存的命中, 未命中, 淘汰与拒绝接纳的计数."""
+
+    __slots__ = ("hits", "misses", "evictions", "rejections")
+
+    hits: int
+    misses: int
+    evictions: int
+    rejections: int
+
+    def __init__(self) -> None:
+        self.hits = self.misses = self.evictions = self.rejections = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"MemcacheStats(hits={self.hits}, misses={self.misses}, "
+            f"evictions={self.evictions}, rejections={self.rejections})"
+        )
+
+
+class _LRU:
+    """按最近使用时间淘汰, 所有操作均为 O(1)."""
+
+    def __init__(self) -> None:
+        self.order: OrderedDict[str, None] = OrderedDict()
+
+    def touch(self, key: str) -> None:
+        self.order.move_to_end(key)
+
+    def add(self, key: str) -> None:
+        self.order[key] = None
+
+    def remove(self, key: str) -> None:
+        self.order.pop(key, None)
+
+    def victim(self, skip: str | None = None) -> str | None:
+        for key in self.order:
+            if key != skip:
+                return key
+        return None
+
+    def seen(self, key: str) -> None:
+        pass
+
+    def admit(self, key: str, victim: str) -> bool:
+        return True
+
+    def clear(self) -> None:
+        self.order.clear()
+
+
+class _LFU:
+    """按访问次数淘汰, 次数相同时淘汰最久未使用的; 以频率分桶, 所有操作均为 O(1)."""
+
+    def __init__(self) -> None:
+        self.freq: dict[str, int] = {}
+        self.buckets: dict[int, dict[str, None]] = {}  # 字典保持插入顺序, 桶内最早加入的键即最久未使用的
+        self.min_freq = 0
+
+    def _bump(self, key: str, freq: int) -> None:
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freq[key] = freq + 1
+        target = self.buckets.get(freq + 1)
+        if target is None:
+            self.buckets[freq + 1] = {key: None}
+        else:
+            target[key] = None
+
+    def touch(self, key: str) -> None:
+        self._bump(key, self.freq[key])
+
+    def add(self, key: str) -> None:
+        self.freq[key] = 1
+        bucket = self.buckets.get(1)
+        if bucket is None:
+            self.buckets[1] = {key: None}
+        else:
+            bucket[key] = None
+        self.min_freq = 1
+
+    def remove(self, key: str) -> None:
+        freq = self.freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+
+    def victim(self, skip: str | None = None) -> str | None:
+        if not self.buckets:
+            return None
+        if self.min_freq not in self.buckets:
+            # 最低频率的桶在移除后被清空, 此时才重新查找
+            self.min_freq = min(self.buckets)
+        for key in self.buckets[self.min_freq]:
+            if key != skip:
+                return key
+        # 最低频率的桶中只有 skip 自身
+        rest = [freq for freq in self.buckets if freq != self.min_freq]
+        return next(iter(self.buckets[min(rest)])) if rest else None
+
+    def seen(self, key: str) -> None:
+        pass
+
+    def admit(self, key: str, victim: str) -> bool:
+        return True
+
+    def clear(self) -> None:
+        self.freq.clear()
+        self.buckets.clear()
+        self.min_freq = 0
+
+
+_HALVE = bytes(value >> 1 for value in range(256))
+_MASK64 = (1 << 64) - 1
+
+
+class _TinyLFU(_LRU):
+    """LRU 淘汰加上 TinyLFU 准入: 以 Count-Min Sketch 估计访问频率, 新键只有比将被淘汰的键更常用时才会被接纳.
+
+    计数器为 4 位 (上限 15), 每记录 `10 * capacity` 次访问后全部减半, 使旧的热度逐渐衰减.
+    """
+
+    DEPTH = 4
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self.width = max(16, 1 << (max(capacity, 1) - 1).bit_length())
+        self.shift = 64 - (self.width.bit_length() - 1)
+        self.table = bytearray(self.width * self.DEPTH)
+        self.sample = 10 * max(capacity, 1)
+        self.additions = 0
+
+    def _slots(self, key: str) -> tuple[int, int, int, int]:
+        h = hash(key) & _MASK64
+        width, shift = self.width, self.shift
+        # multiply-shift: 以不同的奇数乘以完整的 64 位哈希值, 取乘积的高位作为各行的下标, 使各行相互独立且用满整个宽度
+        return (
+            (h * 0x9E3779B97F4A7C15 & _MASK64) >> shift,
+            width + ((h * 0xC2B2AE3D27D4EB4F & _MASK64) >> shift),
+            2 * width + ((h * 0x165667B19E3779F9 & _MASK64) >> shift),
+            3 * width + ((h * 0xD6E8FEB86659FD93 & _MASK64) >> shift),
+        )
+
+    def record(self, key: str) -> None:
+        table = self.table
+        a, b, c, d = self._slots(key)
+        if table[a] < 15:
+            table[a] += 1
+        if table[b] < 15:
+            table[b] += 1
+        if table[c] < 15:
+            table[c] += 1
+        if table[d] < 15:
+            table[d] += 1
+        self.additions += 1
+        if self.additions >= self.sample:
+            self.additions //= 2
+            self.table = table.translate(_HALVE)
+
+    def estimate(self, key: str) -> int:
+        table = self.table
+        a, b, c, d = self._slots(key)
+        return min(table[a], table[b], table[c], table[d])
+
+    def touch(self, key: str) -> None:
+        self.record(key)
+        super().touch(key)
+
+    def seen(self, key: str) -> None:
+        self.record(key)
+
+    def admit(self, key: str, victim: str) -> bool:
+        self.record(key)
+        return self.estimate(key) > self.estimate(victim)
 
 
 class Memcache:
     cache: dict[str, tuple[float | None, Any]]
     expire: list[tuple[float, str]]
+    max_entries: int | None
+    max_bytes: int | None
+    stats: MemcacheStats
+    wakeup: asyncio.Event | None
 
     def __init__(
         self,
         cache: dict[str, tuple[float | None, Any]],
         expire: list[tuple[float, str]],
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        policy: EvictionPolicy = "lru",
+        sizeof: Callable[[str, Any], int] = _sizeof,
     ):
+        """
+        Args:
+            cache: 存放缓存条目的字典.
+            expire: 过期时间的堆, 元素为 (过期时间, 键); 与缓存中该键当前的过期时间不一致的元素视为已失效.
+            max_entries: 最多保存的条目数, 默认不限制.
+            max_bytes: 所有条目的总大小上限 (以 `sizeof` 计算), 默认不限制.
+            policy: 超出限制时的淘汰策略, 可为 "lru", "lfu" 或 "tinylfu" (LRU 淘汰并以访问频率决定是否接纳新键).
+            sizeof: 计算单个条目大小的函数, 接受键与值, 默认使用 `sys.getsizeof`.
+        """
         self.cache = cache
         self.expire = expire
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stats = MemcacheStats()
+        self.wakeup = None
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self._fresh: dict[str, float] = {}  # 启用 stale-while-revalidate 的键在何时之前是新鲜的
+        self._sizes: dict[str, int] = {}
+        self._bytes = 0
+        self._policy: _LRU | _LFU | None = None
+        if max_entries is not None or max_bytes is not None:
+            if policy == "lru":
+                self._policy = _LRU()
+            elif policy == "lfu":
+                self._policy = _LFU()
+            elif policy == "tinylfu":
+                self._policy = _TinyLFU(max_entries or 1024)
+            else:
+                raise ValueError(f"unknown eviction policy: {policy!r}")
+            for key in cache:
+                self._policy.add(key)
+                if max_bytes is not None:
+                    self._sizes[key] = size = sizeof(key, cache[key][1])
+                    self._bytes += size
 
-    async def get(self, key: str, default: Any = None) -> Any:
-        value = self.cache.get(key)
-        if value:
-            if value[0] is None or value[0] >= time():
-                return value[1]
-            del self.cache[key]
-        return default
+    @property
+    def size(self) -> int:
+        """当前所有条目的总大小, 仅在设置了 `max_bytes` 时统计."""
+        return self._bytes
 
-    async def set(self, key: str, value: Any, expire: timedelta | None = None) -> None:
-        if expire is None:
-            self.cache[key] = (None, value)
+    def _discard(self, key: str) -> None:
+        if self._fresh:
+            self._fresh.pop(key, None)
+        if self.cache.pop(key, None) is not None and self._policy is not None:
+            self._policy.remove(key)
+            self._bytes -= self._sizes.pop(key, 0)
+
+    def _overflow(self, extra_entries: int = 0, extra_bytes: int = 0) -> bool:
+        if self.max_entries is not None and len(self.cache) + extra_entries > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes + extra_bytes > self.max_bytes
+
+    def _store(self, key: str, entry: tuple[float | None, Any], touch: bool = True, admit: bool = True) -> bool:
+        policy = self._policy
+        if policy is None:
+            self.cache[key] = entry
+            return True
+        size = self.sizeof(key, entry[1]) if self.max_bytes is not None else 0
+        if key in self.cache:
+            self._bytes += size - self._sizes.get(key, 0)
+            if touch:
+                policy.touch(key)
         else:
-            expire_time = time() + expire.total_seconds()
-            self.cache[key] = (expire_time, value)
+            if admit and self.cache and self._overflow(1, size):
+                if not policy.admit(key, policy.victim()):  # type: ignore
+                    self.stats.rejections += 1
+                    return False
+            self._bytes += size
+            policy.add(key)
+        self.cache[key] = entry
+        if self.max_bytes is not None:
+            self._sizes[key] = size
+        # 新写入的条目本身总会保留, 即使它单独超出了 max_bytes
+        while self._overflow() and (victim := policy.victim(key)) is not None:
+            self._discard(victim)
+            self.stats.evictions += 1
+        return True
+
+    def _compact(self) -> None:
+        """以缓存中的条目重建过期时间堆, 丢弃所有已失效的元素, 每个键只保留一个计时."""
+        self.expire[:] = [(entry[0], key) for key, entry in self.cache.items() if entry[0] is not None]
+        heapify(self.expire)
+
+    def next_deadline(self) -> float | None:
+        """最早的过期时间, 没有计时时为 None; 堆顶可能是已失效的计时, 此时返回值早于实际的过期时间."""
+        return self.expire[0][0] if self.expire else None
+
+    def sweep(self, now: float | None = None, limit: int | None = None) -> int:
+        """清除到期的条目.
+
+        堆中的元素只有在其过期时间与缓存中该键当前的过期时间一致时才有效,
+        因此重新设置过的键不会因为旧的计时而被提前清除.
+
+        Args:
+            now: 当前时间, 默认为 `time()`.
+            limit: 本次最多处理的计时数 (包括已失效的), 默认不限制.
+
+        Returns:
+            int: 被清除的条目数.
+        """
+        if now is None:
+            now = time()
+        expire, cache = self.expire, self.cache
+        removed = 0
+        budget = -1 if limit is None else limit
+        while expire and expire[0][0] <= now and budget:
+            budget -= 1
+            deadline, key = heappop(expire)
+            entry = cache.get(key)
+            if entry is not None and entry[0] == deadline:
+                self._discard(key)
+                removed += 1
+        return removed
+
+    def _entry(self, key: str) -> tuple[float | None, Any] | None:
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry[0] is None or entry[0] >= time():
+                self.stats.hits += 1
+                if self._policy is not None:
+                    self._policy.touch(key)
+                return entry
+            self._discard(key)
+        elif self._policy is not None:
+            self._policy.seen(key)
+        self.stats.misses += 1
+        return None
+
+    def _set(self, key: str, value: Any, expire_time: float | None, admit: bool = True) -> None:
+        if self._fresh:
+            self._fresh.pop(key, None)
+        if expire_time is None:
+            self._store(key, (None, value), admit=admit)
+        elif self._store(key, (expire_time, value), admit=admit):
             heappush(self.expire, (expire_time, key))
+            if self.wakeup is not None and self.expire[0][0] == expire_time:
+                # 新的计时早于清理任务正在等待的时间, 唤醒它重新计算
+                self.wakeup.set()
+            if len(self.expire) > 2 * len(self.cache) + 64:
+                self._compact()
 
-    async def delete(self, key: str, strict: bool = False) -> None:
+    def get_nowait(self, key: str, default: Any = None) -> Any:
+        """`get` 的同步版本."""
+        entry = self._entry(key)
+        return default if entry is None else entry[1]
+
+    def set_nowait(self, key: str, value: Any, expire: timedelta | None = None) -> None:
+        """`set` 的同步版本."""
+        self._set(key, value, None if expire is None else time() + expire.total_seconds())
+
+    def _force(self, key: str, value: Any, expire: timedelta | None) -> None:
+        # 计数器等读写一体的操作需要写入生效, 因此跳过 TinyLFU 的接纳判断, 直接淘汰旧条目
+        self._set(key, value, None if expire is None else time() + expire.total_seconds(), admit=False)
+
+    def delete_nowait(self, key: str, strict: bool = False) -> None:
+        """`delete` 的同步版本."""
         if strict or key in self.cache:
             del self.cache[key]
+            if self._fresh:
+                self._fresh.pop(key, None)
+            if self._policy is not None:
+                self._policy.remove(key)
+                self._bytes -= self._sizes.pop(key, 0)
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return self.get_nowait(key, default)
+
+    async def set(self, key: str, value: Any, expire: timedelta | None = None) -> None:
+        self.set_nowait(key, value, expire)
+
+    async def delete(self, key: str, strict: bool = False) -> None:
+        self.delete_nowait(key, strict)
+
+    async def get_many(self, keys: Iterable[str], default: Any = None) -> list[Any]:
+        """获取多个键的值, 结果与 `keys` 一一对应, 不存在的键为 `default`."""
+        get = self.get_nowait
+        return [get(key, default) for key in keys]
+
+    async def set_many(self, items: Mapping[str, Any], expire: timedelta | None = None) -> None:
+        """设置多个键的值, 所有键使用相同的过期时间."""
+        expire_time = None if expire is None else time() + expire.total_seconds()
+        for key, value in items.items():
+            self._set(key, value, expire_time)
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """删除多个键, 不存在的键将被忽略."""
+        for key in keys:
+            self.delete_nowait(key)
+
+    async def incr(self, key: str, delta: int = 1, expire: timedelta | None = None) -> int:
+        """将键的值增加 `delta` 并返回新的值.
+
+        键不存在时以 0 为初始值, 并使用 `expire` 作为过期时间; 键已存在时保留其原有的过期时间.
+        整个操作中不会让出事件循环, 因此对并发的任务而言是原子的.
+        新键的写入不经过 TinyLFU 的接纳判断, 总会生效.
+        """
+        entry = self._entry(key)
+        if entry is None:
+            self._force(key, delta, expire)
+            return delta
+        value = entry[1] + delta
+        self._store(key, (entry[0], value), touch=False)
+        return value
+
+    async def decr(self, key: str, delta: int = 1, expire: timedelta | None = None) -> int:
+        """将键的值减少 `delta` 并返回新的值, 见 `incr`."""
+        return await self.incr(key, -delta, expire)
+
+    async def setdefault(self, key: str, value: Any, expire: timedelta | None = None) -> Any:
+        """键存在时返回其值, 否则设置为 `value` 并返回 `value`; 写入不经过 TinyLFU 的接纳判断."""
+        entry = self._entry(key)
+        if entry is not None:
+            return entry[1]
+        self._force(key, value, expire)
+        return value
+
+    async def getset(self, key: str, value: Any, expire: timedelta | None = None) -> Any:
+        """设置键的值, 并返回其原有的值; 键不存在时返回 None. 写入不经过 TinyLFU 的接纳判断."""
+        entry = self._entry(key)
+        self._force(key, value, expire)
+        return None if entry is None else entry[1]
+
+    async def _compute(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        expire: timedelta | None,
+        stale: timedelta | None,
+    ) -> Any:
+        try:
+            value = await factory()
+            if expire is None or stale is None:
+                self.set_nowait(key, value, expire)
+            else:
+                # 条目保留到过期后再过 stale 的时间, 在此期间仍可返回旧值
+                fresh_until = time() + expire.total_seconds()
+                self._set(key, value, fresh_until + stale.total_seconds())
+                if key in self.cache:
+                    self._fresh[key] = fresh_until
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _refresh(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        expire: timedelta | None,
+        stale: timedelta | None,
+    ) -> asyncio.Task[Any]:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._compute(key, factory, expire, stale))
+            task.add_done_callback(_consume)
+        return task
+
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        expire: timedelta | None = None,
+        *,
+        stale_while_revalidate: timedelta | None = None,
+    ) -> Any:
+        """获取键的值, 不存在时调用 `factory` 计算并缓存.
+
+        同一个键同时只会有一次计算, 并发的调用会等待同一个结果 (计算失败时都会收到同样的异常);
+        计算在单独的任务中进行, 调用方被取消不会影响其他等待者.
+
+        Args:
+            key: 键.
+            factory: 无参数的异步函数, 返回要缓存的值.
+            expire: 值的有效期, 默认不过期.
+            stale_while_revalidate: 值过期后仍可使用的时长. 在此期间调用会立即得到旧值,
+                同时在后台重新计算; 旧值在此期间对 `get` 也仍然可见.
+        """
+        entry = self._entry(key)
+        if entry is not None:
+            fresh_until = self._fresh.get(key)
+            if fresh_until is not None and fresh_until < time():
+                self._refresh(key, factory, expire, stale_while_revalidate)
+            return entry[1]
+        return await asyncio.shield(self._refresh(key, factory, expire, stale_while_revalidate))
 
     async def clear(self) -> None:
         self.cache.clear()
         self.expire.clear()
+        self._fresh.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        if self._policy is not None:
+            self._policy.clear()
 
     async def has(self, key: str) -> bool:
         return key in self.cache
@@ -54,19 +529,39 @@ class Memcache:
 class MemcacheService(Service):
     id = "cache.client/memcache"
 
-    interval: float
+    interval: float | None
+    batch: int
     _cache: dict[str, tuple[float | None, Any]]
     expire: list[tuple[float, str]]
+    _memcache: Memcache
 
     def __init__(
         self,
-        interval: float = 0.1,
+        interval: float | None = None,
         cache: dict[str, tuple[float | None, Any]] | None = None,
         expire: list[tuple[float, str]] | None = None,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        policy: EvictionPolicy = "lru",
+        sizeof: Callable[[str, Any], int] = _sizeof,
+        batch: int = 1024,
     ):
+        """
+        Args:
+            interval: 清理任务两次检查之间的最长间隔, 默认为 None, 即只在最早的过期时间到达或有更早的计时加入时醒来.
+            cache: 存放缓存条目的字典.
+            expire: 过期时间的堆.
+            max_entries, max_bytes, policy, sizeof: 见 `Memcache`.
+            batch: 每批最多处理的计时数, 处理完一批后让出事件循环.
+        """
         self.interval = interval
+        self.batch = batch
         self._cache = cache or {}
         self.expire = expire or []
+        self._memcache = Memcache(
+            self._cache, self.expire, max_entries=max_entries, max_bytes=max_bytes, policy=policy, sizeof=sizeof
+        )
         super().__init__()
 
     @property
@@ -78,13 +573,35 @@ class MemcacheService(Service):
         return {"blocking"}
 
     @property
-    def cache(self):
-        return Memcache(self._cache, self.expire)
+    def cache(self) -> Memcache:
+        return self._memcache
+
+    @property
+    def stats(self) -> MemcacheStats:
+        return self._memcache.stats
 
     async def launch(self, manager: Launart) -> None:
+        memcache = self._memcache
+        wakeup = memcache.wakeup = asyncio.Event()
         async with self.stage("blocking"):
-            while not manager.status.exiting:
-                while self.expire and self.expire[0][0] <= time():
-                    _, key = heappop(self.expire)
-                    self._cache.pop(key, None)
-                await asyncio.sleep(self.interval)
+            sigexit = asyncio.create_task(manager.status.wait_for_sigexit())
+            try:
+                while not sigexit.done():
+                    wakeup.clear()
+                    memcache.sweep(limit=self.batch)
+                    deadline = memcache.next_deadline()
+                    timeout = None if deadline is None else deadline - time()
+                    if timeout is not None and timeout <= 0:
+                        await asyncio.sleep(0)
+                        continue
+                    if self.interval is not None:
+                        timeout = self.interval if timeout is None else min(timeout, self.interval)
+                    waits = [asyncio.create_task(wakeup.wait())]
+                    if timeout is not None:
+                        waits.append(asyncio.create_task(asyncio.sleep(timeout)))
+                    await any_completed(sigexit, *waits)
+                    for task in waits:
+                        task.cancel()
+            finally:
+                memcache.wakeup = None
+                sigexit.cancel()
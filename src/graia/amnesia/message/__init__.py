@@ -1,8 +1,17 @@
+from .batch import ChainBatch as ChainBatch
 from .chain import MessageChain as MessageChain
+from .codec import ChainCodec as ChainCodec
 from .element import Element as Element
+from .element import FrozenText as FrozenText
 from .element import Text as Text
 from .element import Unknown as Unknown
 from .formatter import Formatter as Formatter
+from .lazy import LazyMessageChain as LazyMessageChain
+from .matcher import ChainMatcher as ChainMatcher
+from .regex import ChainMatch as ChainMatch
+from .registry import ElementRegistry as ElementRegistry
+from .rope import RopeMessageChain as RopeMessageChain
+from .view import ChainView as ChainView
 
 Element._chain_class = MessageChain
 MessageChain._text_class = Text
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from itertools import accumulate, repeat
+from operator import lt
+from typing import Any
+
+from .chain import MessageChain
+from .element import Element, Text
+
+
+class ChainBatch:
+    """以列式存储的一批消息链, 用于对大量消息进行批量处理.
+
+    所有 Text 的文字被拼接为一整个字符串, 每个元素记录类型编号, 文字元素另外记录其在字符串中的起止位置.
+    `render`, `startswith`, `endswith`, `has`, `filter` 与 `strip` 直接在这些数组上进行,
+    不会为每条消息创建 `MessageChain`; 筛选与去除空白得到的新批次与原批次共享文字与元素存储.
+
+    每条消息首尾文字元素的范围另外保存为一列, `startswith` 与 `endswith` 只需以 `map`
+    对这些列调用一次 `str.startswith` / `str.endswith`, 不会为每条消息执行 Python 代码.
+    """
+
+    chain_class: type[MessageChain]
+
+    _text: str
+    _elements: list[Element]
+    _types: list[type[Element]]
+    _kinds: array  # 元素的类型编号, 即在 _types 中的下标
+    _kind_bytes: bytes | None  # 类型不超过 256 种时, 以每个元素一字节保存的类型编号
+    _starts: array  # 文字元素的起止位置, 非文字元素为 -1
+    _ends: array
+    _first: array  # 每条消息在 _elements 中的范围
+    _last: array
+    _plain: array  # 每条消息是否只包含文字
+    _heads: tuple[array, array]  # 每条消息第一个元素的文字范围, 不是文字时为 (len(_text) + 1, 0)
+    _tails: tuple[array, array]  # 每条消息最后一个元素的文字范围
+
+    def __init__(self, chains: Iterable[MessageChain], chain_class: type[MessageChain] = MessageChain) -> None:
+        """将消息链转换为列式存储.
+
+        Args:
+            chains (Iterable[MessageChain]): 要转换的消息链.
+            chain_class (type[MessageChain]): 转换回消息链时使用的类.
+        """
+        self.chain_class = chain_class
+        self._elements = elements = []
+        self._types = []
+        codes: dict[type[Element], int] = {}
+        texts: list[str] = []
+        offset = 0
+        kinds, starts, ends, first, last = array("H"), array("q"), array("q"), array("q"), array("q")
+        plain = array("b")
+        for chain in chains:
+            first.append(len(elements))
+            only_text = True
+            for element in chain._content:
+                cls = element.__class__
+                code = codes.get(cls)
+                if code is None:
+                    code = codes[cls] = len(self._types)
+                    self._types.append(cls)
+                kinds.append(code)
+                if isinstance(element, Text):
+                    texts.append(element.text)
+                    starts.append(offset)
+                    offset += len(element.text)
+                    ends.append(offset)
+                else:
+                    starts.append(-1)
+                    ends.append(-1)
+                    only_text = False
+                elements.append(element)
+            last.append(len(elements))
+            plain.append(only_text)
+        self._text = "".join(texts)
+        self._kinds, self._starts, self._ends = kinds, starts, ends
+        self._first, self._last, self._plain = first, last, plain
+        self._kind_bytes = array("B", kinds).tobytes() if len(self._types) <= 256 else None
+        self._heads, self._tails = self._edges(starts, ends, first, last)
+
+    def _edges(self, starts: array, ends: array, first: array, last: array) -> tuple[tuple[array, array], ...]:
+        """计算每条消息首尾文字元素的范围; 首尾不是文字的消息以超出文字长度的起点表示, 使任何前后缀判断都为假."""
+        missing = len(self._text) + 1
+        head_starts, head_ends, tail_starts, tail_ends = array("q"), array("q"), array("q"), array("q")
+        for index in range(len(first)):
+            head, tail = first[index], last[index] - 1
+            if head <= tail and starts[head] >= 0:
+                head_starts.append(starts[head])
+                head_ends.append(ends[head])
+            else:
+                head_starts.append(missing)
+                head_ends.append(0)
+            if head <= tail and starts[tail] >= 0:
+                tail_starts.append(starts[tail])
+                tail_ends.append(ends[tail])
+            else:
+                tail_starts.append(missing)
+                tail_ends.append(0)
+        return (head_starts, head_ends), (tail_starts, tail_ends)
+
+    def _derive(self, **columns: Any) -> ChainBatch:
+        batch = object.__new__(ChainBatch)
+        batch.__dict__.update(self.__dict__)
+        batch.__dict__.update(columns)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._first)
+
+    def _element(self, index: int) -> Element:
+        element = self._elements[index]
+        start, end = self._starts[index], self._ends[index]
+        if start < 0 or end - start == len(element.text):  # type: ignore
+            return element
+        return element._with_text(self._text[start:end])  # type: ignore
+
+    def __getitem__(self, index: int) -> MessageChain:
+        if index < 0:
+            index += len(self)
+        return self.chain_class._build([self._element(i) for i in range(self._first[index], self._last[index])])
+
+    def __iter__(self) -> Iterator[MessageChain]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_chains(self) -> list[MessageChain]:
+        """转换回普通的消息链, 未被修改的元素与原消息链共享."""
+        return list(self)
+
+    def render(self) -> list[str]:
+        """获取每条消息的字符串形式, 与 `str(chain)` 相同.
+
+        只包含文字的消息在文字缓冲区中是连续的, 只需一次切片.
+        """
+        text, starts, ends, elements = self._text, self._starts, self._ends, self._elements
+        result: list[str] = []
+        for first, last, plain in zip(self._first, self._last, self._plain):
+            if first == last:
+                result.append("")
+            elif plain:
+                result.append(text[starts[first] : ends[last - 1]])
+            else:
+                result.append(
+                    "".join(
+                        text[starts[i] : ends[i]] if starts[i] >= 0 else str(elements[i]) for i in range(first, last)
+                    )
+                )
+        return result
+
+    def startswith(self, prefix: str) -> list[bool]:
+        """判断每条消息是否以给出的字符串开头, 与 `MessageChain.startswith` 相同."""
+        return list(map(self._text.startswith, repeat(prefix), *self._heads))
+
+    def endswith(self, suffix: str) -> list[bool]:
+        """判断每条消息是否以给出的字符串结尾, 与 `MessageChain.endswith` 相同."""
+        return list(map(self._text.endswith, repeat(suffix), *self._tails))
+
+    def has(self, element_class: type[Element]) -> list[bool]:
+        """判断每条消息是否包含指定类型 (及其子类) 的元素.
+
+        先将类型编号转换为每个元素一字节的标记并求前缀和, 每条消息范围内的标记数即为两端前缀和之差.
+        """
+        matched = [issubclass(cls, element_class) for cls in self._types]
+        if self._kind_bytes is not None:
+            marks: Iterable[int] = self._kind_bytes.translate(bytes(matched).ljust(256, b"\0"))
+        else:
+            marks = map(matched.__getitem__, self._kinds)
+        counts = list(accumulate(marks, initial=0))
+        return list(map(lt, map(counts.__getitem__, self._first), map(counts.__getitem__, self._last)))
+
+    def filter(self, predicate: Iterable[bool] | Callable[[int], bool]) -> ChainBatch:
+        """筛选出部分消息, 返回共享存储的新批次.
+
+        Args:
+            predicate (Iterable[bool] | Callable[[int], bool]): 与消息一一对应的布尔值 (如 `startswith` 的结果),
+                或是接受消息下标的函数.
+        """
+        mask = map(predicate, range(len(self))) if callable(predicate) else predicate
+        first, last, plain = self._first, self._last, self._plain
+        selected = [index for index, keep in zip(range(len(self)), mask) if keep]
+        (head_starts, head_ends), (tail_starts, tail_ends) = self._heads, self._tails
+
+        def pick(column: array) -> array:
+            return array(column.typecode, map(column.__getitem__, selected))
+
+        return self._derive(
+            _first=pick(first),
+            _last=pick(last),
+            _plain=pick(plain),
+            _heads=(pick(head_starts), pick(head_ends)),
+            _tails=(pick(tail_starts), pick(tail_ends)),
+        )
+
+    def strip(self, chars: str | None = None) -> ChainBatch:
+        """删除每条消息的前导与尾随空白字符, 与 `MessageChain.strip` 相同, 返回新的批次.
+
+        只会调整文字的起止位置, 不会复制文字.
+
+        Args:
+            chars (str, optional): 要删除的字符, 默认为空白字符.
+        """
+        text = self._text
+        starts, ends = array("q", self._starts), array("q", self._ends)
+        first_col, last_col = array("q", self._first), array("q", self._last)
+        skip: Callable[[str], bool] = chars.__contains__ if chars else str.isspace
+        for index in range(len(first_col)):
+            first, last = first_col[index], last_col[index]
+            while first < last and (pos := starts[first]) >= 0:
+                end = ends[first]
+                while pos < end and skip(text[pos]):
+                    pos += 1
+                if pos < end:
+                    starts[first] = pos
+                    break
+                first += 1
+            while last > first and (start := starts[last - 1]) >= 0:
+                pos = ends[last - 1]
+                while pos > start and skip(text[pos - 1]):
+                    pos -= 1
+                if pos > start:
+                    ends[last - 1] = pos
+                    break
+                last -= 1
+            first_col[index], last_col[index] = first, last
+        heads, tails = self._edges(starts, ends, first_col, last_col)
+        return self._derive(_starts=starts, _ends=ends, _first=first_col, _last=last_col, _heads=heads, _tails=tails)
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator, Sequence
-from copy import deepcopy
+import re
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from itertools import chain as chain_iter
+from operator import is_
 from typing import TYPE_CHECKING, Any, TypeVar, overload
 from typing_extensions import Self
 
-from .element import Element, Text
+from .element import _MUTATIONS, Element, Text
+from .regex import PLACEHOLDER, ChainMatch
 
 if TYPE_CHECKING:
+    from .matcher import Pattern, Replacement
+    from .view import ChainView
+
     E = TypeVar("E", bound=Element)
 
 
@@ -26,7 +33,7 @@ class MessageChain:
 
     - `get_one`: 获取消息链中的第 index + 1 个特定类型的元素
 
-    - `merge`: 将消息链中相邻的 Text 元素合并为一个 Text 元素.
+    - `merge`: 将消息链中相邻的 Text 元素合并为一个 Text 元素. 以 `MessageChain(..., merge=True)` 创建的消息链始终保持合并状态.
 
     - `startswith`: 判断消息链是否以指定的文本开头
 
@@ -38,6 +45,10 @@ class MessageChain:
 
     - `split`: 用指定文本将消息链拆分为多个
 
+    - `iter_split`: 逐个生成 `split` 的结果, 可以提前停止
+
+    - `rsplit`: 从末尾开始拆分消息链
+
     - `append`: 将指定的元素添加到消息链的末尾
 
     - `extend`: 将指定的序列/消息链添加到消息链的末尾
@@ -50,7 +61,9 @@ class MessageChain:
 
     - `count`: 获取消息链中指定元素的数量
 
-    - `copy`: 获取消息链的拷贝
+    - `view`: 创建引用本消息链存储的只读视图, 切片与去除前后缀不会复制元素
+
+    - `copy`: 获取消息链的拷贝, 与原消息链共享元素存储, 在修改时才进行复制 (写时复制)
 
     - `chain.join(chains)`: 拼接多个消息链并插入指定内容
 
@@ -66,27 +79,202 @@ class MessageChain:
 
     - `replace`: 替换消息链的一部分
 
+    - `replace_many`: 在一次扫描中进行多组替换
+
+    - `match` / `search` / `finditer` / `sub`: 在消息链上进行正则匹配与替换, 非文字元素以 `PLACEHOLDER` 表示
+
     """
 
     _text_class: type[Text]
 
-    content: list[Element]
-
-    def __init__(self, elements: Sequence[str | Element]):
+    _content: list[Element]
+    _shared: bool = False
+    _exposed: bool = False
+    _snapshot: list[Element] | None = None
+    _type_index: dict[type[Element], list[int]] | None = None
+    _type_cache: dict[type[Element] | tuple[type[Element], ...], list[int]] | None = None
+    _text_cache: str | None = None
+    _segment_cache: tuple[list[str], list[Element]] | None = None
+    _unit_cache: tuple[str, list[int]] | None = None
+    _merged: bool | None = None
+    _trackable: bool | None = None
+    _mutations: int = -1
+    _auto_merge: bool = False
+
+    def __init__(self, elements: Sequence[str | Element], *, merge: bool = False):
         """从传入的序列(可以是元组 tuple, 也可以是列表 list) 创建消息链.
         Args:
             elements (Sequence[str | Element]): 包含且仅包含消息元素和字符串的序列
+            merge (bool): 是否保持消息链始终处于合并状态, 即不存在相邻的 Text 元素.
+                启用后, `append`, `extend`, `+` 与 `+=` 会在添加时合并相邻的文字,
+                由其派生的消息链也会保持该状态; 直接修改 `content` 则不会自动合并.
         Returns:
             MessageChain: 以传入的序列作为所承载消息的消息链
         """
-        self.content = []
+        self._content = []
         if isinstance(elements, str):
-            self.content.append(self._text_class(elements))
+            self._content.append(self._text_class(elements))
         else:
             for element in elements:
                 if isinstance(element, str):
                     element = self._text_class(element)
-                self.content.append(element)
+                self._content.append(element)
+        if merge:
+            self._auto_merge = True
+            self._content = self._coalesce(self._content)
+            self._merged = True
+
+    @property
+    def content(self) -> list[Element]:
+        """消息链所承载的元素列表.
+
+        由于元素列表可能与其他消息链共享, 访问该属性时会先取得列表的所有权, 因此可以安全地原地修改.
+        此后该列表不再与其他消息链共享, `copy` 与 `view` 会立即复制它;
+        各项缓存也会在使用前与建立时的快照比较, 以发现通过该列表进行的修改.
+        """
+        if self._shared:
+            self._content = self._content.copy()
+            self._shared = False
+        if not self._exposed:
+            self._exposed = True
+            self._invalidate()
+        return self._content
+
+    @content.setter
+    def content(self, value: list[Element]) -> None:
+        self._content = value
+        self._shared = False
+        self._exposed = True
+        self._invalidate()
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """从 pickle 的数据中恢复状态, 兼容以 `content` 保存元素列表的旧版本数据."""
+        state = dict(state)
+        if "content" in state:
+            self._content = state.pop("content")
+        self.__dict__.update(state)
+
+    def _derive(self, content: list[Element], shared: bool = False) -> Self:
+        """跳过 `__init__` 的检查, 直接以给出的元素列表创建同类型的消息链.
+
+        Args:
+            content (list[Element]): 元素列表, 其中不应包含字符串.
+            shared (bool): 该列表是否与其他消息链共享.
+        """
+        if not self._auto_merge:
+            return self._build(content, shared)
+        merged = content if content is self._content and self._is_merged() else self._coalesce(content)
+        chain = self._build(merged, shared and merged is content)
+        chain._auto_merge = True
+        chain._merged = True
+        return chain
+
+    @classmethod
+    def _build(cls, content: list[Element], shared: bool = False) -> Self:
+        """与 `_derive` 相同, 但直接以类创建."""
+        chain = object.__new__(cls)
+        chain._content = content
+        chain._shared = shared
+        return chain
+
+    def _own(self) -> list[Element]:
+        """取得元素列表的所有权, 若列表与其他消息链共享则先复制一份. 所有的原地修改都应经过此方法."""
+        if self._shared:
+            self._content = self._content.copy()
+            self._shared = False
+        self._invalidate()
+        return self._content
+
+    def _lend(self) -> tuple[list[Element], bool]:
+        """获取可以交给新的消息链使用的元素列表, 以及该列表是否被共享.
+
+        列表通过 `content` 交给外部后可能随时被修改, 因此只能复制; 否则将其标记为共享 (写时复制).
+        """
+        if self._exposed:
+            return self._content.copy(), False
+        self._shared = True
+        return self._content, True
+
+    def _assign(self, content: list[Element]) -> Self:
+        """以给出的元素列表替换自身的内容."""
+        if self._shared:
+            self._content = content
+            self._shared = False
+        else:
+            self._content[:] = content
+        self._invalidate()
+        return self
+
+    def _invalidate(self) -> None:
+        """清除依赖于元素列表的缓存."""
+        self._snapshot = None
+        self._type_index = None
+        self._type_cache = None
+        self._text_cache = None
+        self._segment_cache = None
+        self._unit_cache = None
+        self._merged = None
+        self._trackable = None
+
+    def _check(self) -> None:
+        """在读取缓存前调用. 元素列表通过 `content` 交给外部后可能被直接修改, 此时与快照比较, 不一致则清除缓存.
+
+        快照在缓存为空时建立, 只按地址比较元素: 替换为相等但类型不同的元素 (如 Text 与 FrozenText) 同样会使缓存失效.
+        """
+        if self._exposed:
+            snapshot, content = self._snapshot, self._content
+            if snapshot is None:
+                self._snapshot = content.copy()
+            elif len(snapshot) != len(content) or not all(map(is_, snapshot, content)):
+                self._invalidate()
+                self._snapshot = content.copy()
+
+    def _cacheable(self) -> bool:
+        """在读取依赖于元素内容 (而非元素列表) 的缓存, 如 `str(chain)` 前调用, 判断能否使用并建立这些缓存.
+
+        要求所有元素都不可修改或受到追踪; 自缓存建立后有受追踪的元素被修改过时, 先清除这些缓存.
+        """
+        self._check()
+        if self._trackable is None:
+            self._trackable = all(element._immutable or element._tracked for element in self._content)
+        if not self._trackable:
+            return False
+        if self._mutations != _MUTATIONS[0]:
+            self._text_cache = None
+            self._segment_cache = None
+            self._unit_cache = None
+            self._mutations = _MUTATIONS[0]
+        return True
+
+    def _index_types(self) -> dict[type[Element], list[int]]:
+        """获取各个元素类型 (不含子类) 在消息链中的下标, 结果会被缓存直到消息链被修改."""
+        self._check()
+        index = self._type_index
+        if index is None:
+            index = {}
+            for i, element in enumerate(self._content):
+                if (positions := index.get(element.__class__)) is None:
+                    index[element.__class__] = [i]
+                else:
+                    positions.append(i)
+            self._type_index = index
+        return index
+
+    def _positions(self, element_class: type[Element] | tuple[type[Element], ...]) -> list[int]:
+        """获取所有属于指定类型 (包括子类) 的元素的下标, 结果会被缓存直到消息链被修改. 返回的列表不应被修改."""
+        self._check()
+        cache = self._type_cache
+        if cache is None:
+            cache = self._type_cache = {}
+        positions = cache.get(element_class)
+        if positions is None:
+            matched = [pos for cls, pos in self._index_types().items() if issubclass(cls, element_class)]
+            if len(matched) > 1:
+                positions = sorted(chain_iter.from_iterable(matched))
+            else:
+                positions = matched[0] if matched else []
+            cache[element_class] = positions
+        return positions
 
     def has(self, item: Element | type[Element] | Self | Sequence[str | Element]) -> bool:
         """
@@ -99,9 +287,9 @@ class MessageChain:
             bool: 判断结果
         """
         if isinstance(item, type):
-            return item in [type(i) for i in self.content]
+            return item in self._index_types()
         if isinstance(item, Element):
-            return item in self.merge().content
+            return item in self.merge()._content
         if isinstance(item, (Sequence, MessageChain)):
             return bool(self.index_sub(item))
 
@@ -118,9 +306,11 @@ class MessageChain:
         Returns:
             list[E]: 获取到的符合要求的所有消息元素; 另: 可能是空列表([]).
         """
-        if count == -1:
-            count = len(self.content)
-        return [i for i in self.content if isinstance(i, element_class)][:count]
+        content = self._content
+        positions = self._positions(element_class)
+        if count != -1:
+            positions = positions[:count]
+        return [content[i] for i in positions]  # type: ignore
 
     def get_one(self, element_class: type[E], index: int) -> E:
         """获取消息链中第 index + 1 个特定类型的消息元素
@@ -130,7 +320,7 @@ class MessageChain:
         Returns:
             T: 消息链第 index + 1 个特定类型的消息元素
         """
-        return self.get(element_class)[index]
+        return self._content[self._positions(element_class)[index]]  # type: ignore
 
     def get_first(self, element_class: type[E]) -> E:
         """获取消息链中第 1 个特定类型的消息元素
@@ -139,14 +329,18 @@ class MessageChain:
         Returns:
             T: 消息链第 1 个特定类型的消息元素
         """
-        return self.get(element_class)[0]
+        return self._content[self._positions(element_class)[0]]  # type: ignore
 
     def __str__(self) -> str:
         """获取以字符串形式表示的消息链, 且趋于通常你见到的样子.
         Returns:
             str: 以字符串形式表示的消息链
         """
-        return "".join(str(i) for i in self.content)
+        if not self._cacheable():
+            return "".join(map(str, self._content))
+        if self._text_cache is None:
+            self._text_cache = "".join(map(str, self._content))
+        return self._text_cache
 
     def join(self, *chains: Self | Iterable[Self]) -> Self:
         """将多个消息链连接起来, 并在其中插入自身.
@@ -167,12 +361,26 @@ class MessageChain:
 
         for chain in list_chains:
             if chain is not list_chains[0]:
-                result.extend(deepcopy(self.content))
-            result.extend(deepcopy(chain.content))
-        return self.__class__(result).merge()
+                result.extend(self._content)
+            result.extend(chain._content)
+        return self._derive(result).merge(copy=False)
 
     __contains__ = has
 
+    def view(self, start: int | None = None, stop: int | None = None) -> ChainView:
+        """创建引用本消息链元素存储的只读视图, 不会复制元素.
+
+        Args:
+            start (int, optional): 起始元素下标, 与切片相同.
+            stop (int, optional): 结束元素下标, 与切片相同.
+
+        Returns:
+            ChainView: 视图, 可通过 `materialize` 转换为普通的消息链.
+        """
+        from .view import ChainView
+
+        return ChainView(self, start, stop)
+
     @overload
     def __getitem__(self, item: type[E]) -> list[E]: ...
 
@@ -198,9 +406,9 @@ class MessageChain:
             list[Element] | Element | MessageChain: 索引结果.
         """
         if isinstance(item, slice):
-            return self.__class__(self.content[item])
+            return self._derive(self._content[item])
         if isinstance(item, int):
-            return self.content[item]
+            return self._content[item]
         elif issubclass(item, Element):
             return self.get(item)
         else:
@@ -209,28 +417,82 @@ class MessageChain:
     def merge(self, *, copy: bool = True) -> Self:
         """合并相邻的 Text 项, 选择返回一个新的消息链实例
 
+        已处于合并状态的消息链不会被重建; 未与其他文字相邻的 Text 元素将原样保留.
+
         Returns:
             MessageChain: 得到的新的消息链实例, 里面不应存在有任何的相邻的 Text 元素.
         """
+        if self._is_merged():
+            return self.copy() if copy else self
+        result = self._coalesce(self._content)
+        chain = self._derive(result) if copy else self._assign(result)
+        chain._check()
+        chain._merged = True
+        return chain
+
+    def _is_merged(self) -> bool:
+        """判断消息链中是否不存在相邻的 Text 元素, 结果会被缓存直到消息链被修改."""
+        self._check()
+        if self._merged is None:
+            previous = False
+            for element in self._content:
+                current = isinstance(element, Text)
+                if current and previous:
+                    self._merged = False
+                    break
+                previous = current
+            else:
+                self._merged = True
+        return self._merged
 
-        result = []
-
-        texts = []
-        for i in self.content:
-            if not isinstance(i, Text):
-                if texts:
+    def _coalesce(self, content: list[Element]) -> list[Element]:
+        """合并列表中相邻的 Text 元素, 单独的 Text 元素原样保留; 若无需合并则返回原列表."""
+        result: list[Element] = []
+        head: Text | None = None
+        texts: list[str] | None = None
+        changed = False
+        for element in content:
+            if isinstance(element, Text):
+                if head is None:
+                    head = element
+                elif texts is None:
+                    texts = [head.text, element.text]
+                else:
+                    texts.append(element.text)
+                continue
+            if head is not None:
+                if texts is None:
+                    result.append(head)
+                else:
                     result.append(self._text_class("".join(texts)))
-                    texts.clear()  # 清空缓存
-                result.append(i)
+                    texts = None
+                    changed = True
+                head = None
+            result.append(element)
+        if head is not None:
+            if texts is None:
+                result.append(head)
             else:
-                texts.append(i.text)
-        if texts:
-            result.append(self._text_class("".join(texts)))
-            texts.clear()  # 清空缓存
-        if copy:
-            return self.__class__(result)
-        self.content.clear()
-        self.content.extend(result)
+                result.append(self._text_class("".join(texts)))
+                changed = True
+        return result if changed else content
+
+    def _push(self, elements: list[Element]) -> Self:
+        """将元素添加到末尾; 若启用了自动合并, 则与末尾的文字合并."""
+        if not self._auto_merge:
+            self._own().extend(elements)
+            return self
+        self._check()
+        merged = self._merged
+        content = self._own()
+        elements = self._coalesce(elements)
+        if elements and content and isinstance(head := elements[0], Text) and isinstance(last := content[-1], Text):
+            content[-1] = self._text_class(last.text + head.text)
+            content.extend(elements[1:])
+        else:
+            content.extend(elements)
+        self._check()
+        self._merged = merged
         return self
 
     def exclude(self, *types: type[Element]) -> Self:
@@ -240,7 +502,7 @@ class MessageChain:
         Returns:
             MessageChain: 返回的消息链中不包含参数中给出的消息元素类型
         """
-        return self.__class__([i for i in self.content if not isinstance(i, types)])
+        return self._derive([i for i in self._content if not isinstance(i, types)])
 
     def include(self, *types: type[Element]) -> Self:
         """将只在给出的消息元素类型中符合的消息元素重新包装为一个新的消息链
@@ -249,45 +511,165 @@ class MessageChain:
         Returns:
             MessageChain: 返回的消息链中只包含参数中给出的消息元素类型
         """
-        return self.__class__([i for i in self.content if isinstance(i, types)])
+        return self._derive([i for i in self._content if isinstance(i, types)])
+
+    @staticmethod
+    def _separators(text: str, pattern: str | re.Pattern[str], reverse: bool = False) -> Iterator[tuple[int, int]]:
+        if isinstance(pattern, str):
+            if reverse:
+                index = text.rfind(pattern)
+                while index >= 0:
+                    yield index, index + len(pattern)
+                    index = text.rfind(pattern, 0, index)
+            else:
+                index = text.find(pattern)
+                while index >= 0:
+                    yield index, index + len(pattern)
+                    index = text.find(pattern, index + len(pattern))
+        elif reverse:
+            yield from reversed([match.span() for match in pattern.finditer(text)])
+        else:
+            for match in pattern.finditer(text):
+                yield match.span()
+
+    def iter_split(
+        self, pattern: str | re.Pattern[str] = " ", raw_string: bool = False, maxsplit: int = -1
+    ) -> Iterator[Self]:
+        """与 `split` 相同, 但逐个生成分割结果, 在不再需要后续部分时可以提前停止, 不会分割整条消息.
 
-    def split(self, pattern: str = " ", raw_string: bool = False) -> list[Self]:
+        Args:
+            pattern (str | re.Pattern[str]): 分隔符或正则表达式, 只在单个文本元素内匹配. 默认为单个空格.
+            raw_string (bool): 是否要包含 "空" 的文本元素.
+            maxsplit (int): 最多分割的次数, 剩余部分保持原样作为最后一项; 默认为 -1, 即不限制.
+
+        Yields:
+            Self: 分割结果.
+        """
+        if pattern == "":
+            raise ValueError("empty separator")
+        content = self._content
+        tmp: list[Element] = []
+        for pos, element in enumerate(content):
+            if not isinstance(element, Text):
+                tmp.append(element)
+                continue
+            text = element.text
+            start = 0
+            if maxsplit:
+                for sep_start, sep_end in self._separators(text, pattern):
+                    piece = text[start:sep_start]
+                    if piece or raw_string:
+                        tmp.append(self._text_class(piece))
+                    if tmp:
+                        yield self._derive(tmp)
+                        tmp = []
+                    start = sep_end
+                    maxsplit -= 1
+                    if not maxsplit:
+                        break
+            if not maxsplit:
+                if start < len(text) or raw_string:
+                    tmp.append(element if not start else self._text_class(text[start:]))
+                tmp.extend(content[pos + 1 :])
+                break
+            if start < len(text) or raw_string:
+                tmp.append(self._text_class(text[start:]))
+        if tmp:
+            yield self._derive(tmp)
+
+    def split(self, pattern: str | re.Pattern[str] = " ", raw_string: bool = False, maxsplit: int = -1) -> list[Self]:
         """和 `str.split` 差不多, 提供一个字符串, 然后返回分割结果.
 
         Args:
-            pattern (str): 分隔符. 默认为单个空格.
+            pattern (str | re.Pattern[str]): 分隔符或正则表达式, 只在单个文本元素内匹配. 默认为单个空格.
             raw_string (bool): 是否要包含 "空" 的文本元素.
+            maxsplit (int): 最多分割的次数, 剩余部分保持原样作为最后一项; 默认为 -1, 即不限制.
 
         Returns:
             list[Self]: 分割结果, 行为和 `str.split` 差不多.
         """
-
+        if maxsplit >= 0 or not isinstance(pattern, str):
+            return list(self.iter_split(pattern, raw_string, maxsplit))
+        if pattern == "":
+            raise ValueError("empty separator")
         result: list[Self] = []
         tmp = []
-        for element in self.content:
+        for element in self._content:
             if isinstance(element, Text):
                 split_result = element.text.split(pattern)
                 for index, split_str in enumerate(split_result):
                     if tmp and index > 0:
-                        result.append(self.__class__(tmp))
+                        result.append(self._derive(tmp))
                         tmp = []
                     if split_str or raw_string:
                         tmp.append(self._text_class(split_str))
             else:
                 tmp.append(element)
         if tmp:
-            result.append(self.__class__(tmp))
+            result.append(self._derive(tmp))
             tmp = []
         return result
 
+    def iter_rsplit(
+        self, pattern: str | re.Pattern[str] = " ", raw_string: bool = False, maxsplit: int = -1
+    ) -> Iterator[Self]:
+        """与 `iter_split` 相同, 但从消息链末尾开始分割, 并按从后往前的顺序生成分割结果."""
+        if pattern == "":
+            raise ValueError("empty separator")
+        content = self._content
+        tmp: list[Element] = []
+        for pos in range(len(content) - 1, -1, -1):
+            element = content[pos]
+            if not isinstance(element, Text):
+                tmp.append(element)
+                continue
+            text = element.text
+            end = len(text)
+            if maxsplit:
+                for sep_start, sep_end in self._separators(text, pattern, reverse=True):
+                    piece = text[sep_end:end]
+                    if piece or raw_string:
+                        tmp.append(self._text_class(piece))
+                    if tmp:
+                        yield self._derive(tmp[::-1])
+                        tmp = []
+                    end = sep_start
+                    maxsplit -= 1
+                    if not maxsplit:
+                        break
+            if not maxsplit:
+                if end or raw_string:
+                    tmp.append(element if end == len(text) else self._text_class(text[:end]))
+                tmp.extend(reversed(content[:pos]))
+                break
+            if end or raw_string:
+                tmp.append(self._text_class(text[:end]))
+        if tmp:
+            yield self._derive(tmp[::-1])
+
+    def rsplit(self, pattern: str | re.Pattern[str] = " ", raw_string: bool = False, maxsplit: int = -1) -> list[Self]:
+        """和 `str.rsplit` 差不多, 从消息链末尾开始分割, 结果仍按原顺序排列.
+
+        Args:
+            pattern (str | re.Pattern[str]): 分隔符或正则表达式, 只在单个文本元素内匹配. 默认为单个空格.
+            raw_string (bool): 是否要包含 "空" 的文本元素.
+            maxsplit (int): 最多分割的次数, 剩余部分保持原样作为第一项; 默认为 -1, 即不限制.
+
+        Returns:
+            list[Self]: 分割结果.
+        """
+        result = list(self.iter_rsplit(pattern, raw_string, maxsplit))
+        result.reverse()
+        return result
+
     def __repr__(self) -> str:
-        return f"MessageChain({self.content!r})"
+        return f"MessageChain({self._content!r})"
 
     def __iter__(self) -> Iterator[Element]:
-        yield from self.content
+        yield from self._content
 
     def __len__(self) -> int:
-        return len(self.content)
+        return len(self._content)
 
     def startswith(self, string: str) -> bool:
         """判断消息链是否以给出的字符串开头
@@ -299,9 +681,9 @@ class MessageChain:
             bool: 是否以给出的字符串开头
         """
 
-        if not self.content or not isinstance(self.content[0], Text):
+        if not self._content or not isinstance(self._content[0], Text):
             return False
-        return self.content[0].text.startswith(string)
+        return self._content[0].text.startswith(string)
 
     def endswith(self, string: str) -> bool:
         """判断消息链是否以给出的字符串结尾
@@ -313,9 +695,9 @@ class MessageChain:
             bool: 是否以给出的字符串结尾
         """
 
-        if not self.content or not isinstance(self.content[-1], Text):
+        if not self._content or not isinstance(self._content[-1], Text):
             return False
-        return self.content[-1].text.endswith(string)
+        return self._content[-1].text.endswith(string)
 
     def only(self, *element_classes: type[Element]) -> bool:
         """判断消息链中是否只含有特定类型元素.
@@ -326,7 +708,7 @@ class MessageChain:
         Returns:
             bool: 判断结果
         """
-        return all(isinstance(i, element_classes) for i in self.content)
+        return all(issubclass(cls, element_classes) for cls in self._index_types())
 
     def append(self, element: Element | str, copy: bool = False) -> Self:
         """
@@ -342,7 +724,18 @@ class MessageChain:
         chain_ref = self.copy() if copy else self
         if isinstance(element, str):
             element = self._text_class(element)
-        chain_ref.content.append(element)
+        if not chain_ref._auto_merge:
+            chain_ref._own().append(element)
+            return chain_ref
+        chain_ref._check()
+        merged = chain_ref._merged
+        content = chain_ref._own()
+        if isinstance(element, Text) and content and isinstance(last := content[-1], Text):
+            content[-1] = self._text_class(last.text + element.text)
+        else:
+            content.append(element)
+        chain_ref._check()
+        chain_ref._merged = merged
         return chain_ref
 
     def extend(
@@ -367,7 +760,7 @@ class MessageChain:
             elif isinstance(i, str):
                 result.append(self._text_class(i))
             elif isinstance(i, MessageChain):
-                result.extend(i.content)
+                result.extend(i._content)
             else:
                 for e in i:
                     if isinstance(e, str):
@@ -375,9 +768,8 @@ class MessageChain:
                     else:
                         result.append(e)
         if copy:
-            return self.__class__(deepcopy(self.content) + result)
-        self.content.extend(result)
-        return self
+            return self._derive(self._content + result)
+        return self._push(result)
 
     def empty(self) -> bool:
         """
@@ -387,16 +779,31 @@ class MessageChain:
             bool: 判断结果。
         """
 
-        return not bool(self.content and str(self))
+        return not self
 
     def copy(self) -> Self:
         """
         拷贝本消息链.
 
+        副本与本消息链共享元素存储, 直到其中一方被修改时才会复制元素列表 (写时复制);
+        元素本身不会被复制, 因此不应原地修改从消息链中取出的元素.
+
         Returns:
             MessageChain: 拷贝的副本.
         """
-        return self.__class__(deepcopy(self.content))
+        content, shared = self._lend()
+        chain = self._derive(content, shared=shared)
+        if not shared:
+            return chain
+        chain._type_index = self._type_index
+        chain._type_cache = self._type_cache
+        chain._text_cache = self._text_cache
+        chain._segment_cache = self._segment_cache
+        chain._unit_cache = self._unit_cache
+        chain._trackable = self._trackable
+        chain._mutations = self._mutations
+        chain._merged = self._merged
+        return chain
 
     def index(self, element_type: type[Element]) -> int | None:
         """
@@ -409,7 +816,8 @@ class MessageChain:
             int | None: 元素下标, 若未找到则为 None.
 
         """
-        return next((i for i, e in enumerate(self.content) if isinstance(e, element_type)), None)
+        positions = self._positions(element_type)
+        return positions[0] if positions else None
 
     def count(self, element: type[Element] | Element) -> int:
         """
@@ -422,56 +830,196 @@ class MessageChain:
             int: 元素数量
         """
         if isinstance(element, Element):
-            return sum(i == element for i in self.content)
-        return sum(isinstance(i, element) for i in self.content)
+            return sum(i == element for i in self._content)
+        return len(self._positions(element))
 
-    def index_sub(self, sub: MessageChain | Sequence[str | Element]) -> list[int]:
-        """判断消息链是否含有子链. 使用 KMP 算法.
+    @staticmethod
+    def _split_segments(seq: Iterable[str | Element]) -> tuple[list[str], list[Element]]:
+        """将序列拆分为文字段与非文字元素, 相邻的文字会被拼接.
+
+        返回的 `texts` 总比 `elements` 多一项, 原序列即为 `texts[0], elements[0], texts[1], ..., texts[-1]`.
+        """
+        texts: list[str] = []
+        elements: list[Element] = []
+        buffer: list[str] = []
+        for e in seq:
+            if isinstance(e, Text):
+                buffer.append(e.text)
+            elif isinstance(e, str):
+                buffer.append(e)
+            else:
+                texts.append("".join(buffer))
+                buffer = []
+                elements.append(e)
+        texts.append("".join(buffer))
+        return texts, elements
+
+    def _segments(self) -> tuple[list[str], list[Element]]:
+        """获取自身的文字段与非文字元素. 返回的列表不应被修改.
+
+        结果会被缓存, 缓存条件见 `_cacheable`.
+        """
+        if not self._cacheable():
+            return self._split_segments(self._content)
+        if self._segment_cache is None:
+            self._segment_cache = self._split_segments(self._content)
+        return self._segment_cache
+
+    def _units(self) -> tuple[str, list[int]]:
+        """获取单位文本 (非文字元素以 `PLACEHOLDER` 表示) 与每个元素的起始单位, 缓存条件与 `_segments` 相同."""
+        cacheable = self._cacheable()
+        if cacheable and self._unit_cache is not None:
+            return self._unit_cache
+        starts: list[int] = []
+        offset = 0
+        for element in self._content:
+            starts.append(offset)
+            offset += len(element.text) if isinstance(element, Text) else 1
+        starts.append(offset)
+        units = (PLACEHOLDER.join(self._segments()[0]), starts)
+        if cacheable:
+            self._unit_cache = units
+        return units
+
+    def _locate(self, unit: int, starts: list[int] | None = None) -> tuple[int, int]:
+        """将单位位置转换为 (元素下标, 元素内的偏移), 跳过空的 Text 元素.
 
         Args:
-            sub (MessageChain | Sequence[str | Element]): 要判断的子链.
+            unit (int): 单位位置.
+            starts (list[int], optional): 已经取得的各元素起始单位, 默认重新获取.
+        """
+        if starts is None:
+            starts = self._units()[1]
+        index = bisect_right(starts, unit) - 1
+        if index >= len(self._content):
+            return len(self._content), 0
+        return index, unit - starts[index]
+
+    def _unit_slice(self, start: int, end: int, total: int | None = None) -> Self:
+        """获取 [start, end) 单位范围内的子消息链, total 为总单位数, 默认重新计算."""
+        if total is None:
+            total = len(self._units()[0])
+        return self._splice([(0, start, ()), (end, total, ())])
+
+    @staticmethod
+    def _compile(pattern: str | re.Pattern[str], flags: int) -> re.Pattern[str]:
+        return re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+
+    def match(self, pattern: str | re.Pattern[str], flags: int = 0) -> ChainMatch[Self] | None:
+        """与 `re.match` 类似, 在消息链的开头进行正则匹配.
+
+        每个非文字元素在匹配时以一个 `PLACEHOLDER` (U+FFFC) 字符表示, 可在表达式中用 `\\ufffc` 匹配.
+        匹配结果保存了匹配时的单位文本, 取出分组时不会重新生成.
+
+        Args:
+            pattern (str | re.Pattern[str]): 正则表达式.
+            flags (int): 编译 `pattern` 时使用的标志.
 
         Returns:
-            List[int]: 所有找到的下标.
+            ChainMatch | None: 匹配结果, 分组以消息链的形式给出.
         """
+        units = self._units()
+        if (result := self._compile(pattern, flags).match(units[0])) is None:
+            return None
+        return ChainMatch(self, result, units[1])
+
+    def fullmatch(self, pattern: str | re.Pattern[str], flags: int = 0) -> ChainMatch[Self] | None:
+        """与 `match` 相同, 但要求匹配整条消息链."""
+        units = self._units()
+        if (result := self._compile(pattern, flags).fullmatch(units[0])) is None:
+            return None
+        return ChainMatch(self, result, units[1])
+
+    def search(self, pattern: str | re.Pattern[str], flags: int = 0) -> ChainMatch[Self] | None:
+        """与 `match` 相同, 但在消息链的任意位置查找第一个匹配."""
+        units = self._units()
+        if (result := self._compile(pattern, flags).search(units[0])) is None:
+            return None
+        return ChainMatch(self, result, units[1])
+
+    def finditer(self, pattern: str | re.Pattern[str], flags: int = 0) -> Iterator[ChainMatch[Self]]:
+        """与 `re.finditer` 类似, 逐个给出所有不重叠的匹配."""
+        text, starts = self._units()
+        for result in self._compile(pattern, flags).finditer(text):
+            yield ChainMatch(self, result, starts)
+
+    def sub(
+        self,
+        pattern: str | re.Pattern[str],
+        repl: Replacement | Callable[[ChainMatch[Self]], Replacement],
+        count: int = 0,
+        flags: int = 0,
+    ) -> Self:
+        """与 `re.sub` 类似, 替换正则表达式的所有匹配. (在副本上操作)
 
-        def unzip(seq: Sequence[str | Element]) -> list[str | Element]:
-            res: list[str | Element] = []
-            for e in seq:
-                if isinstance(e, Text):
-                    res.extend(e.text)
-                elif isinstance(e, str):
-                    res.extend(e)
-                else:
-                    res.append(e)
-            return res
+        字符串形式的 `repl` 会原样插入, 不会展开 `\\1` 等分组引用; 需要使用分组时请传入函数.
 
-        pattern: list[str | Element] = unzip(sub.content) if isinstance(sub, MessageChain) else unzip(sub)
+        Args:
+            pattern (str | re.Pattern[str]): 正则表达式.
+            repl (Replacement | Callable[[ChainMatch], Replacement]): 替换内容, 或接受匹配结果并返回替换内容的函数.
+            count (int): 最多替换的次数, 默认为 0, 即不限制.
+            flags (int): 编译 `pattern` 时使用的标志.
 
-        match_target: list[str | Element] = unzip(self.content)
+        Returns:
+            MessageChain: 修改后的消息链, 若未替换则返回副本.
+        """
+        from .matcher import ChainMatcher
+
+        spans: list[tuple[int, int, Sequence[Element]]] = []
+        fixed = None if callable(repl) else ChainMatcher._elements(self, repl)
+        text, starts = self._units()
+        for result in self._compile(pattern, flags).finditer(text):
+            if fixed is not None:
+                replacement = fixed
+            else:
+                replacement = ChainMatcher._elements(self, repl(ChainMatch(self, result, starts)))  # type: ignore
+            spans.append((*result.span(), replacement))
+            if len(spans) == count:
+                break
+        return self._splice(spans) if spans else self.copy()
 
-        if len(match_target) < len(pattern):
-            return []
+    def index_sub(self, sub: MessageChain | Sequence[str | Element]) -> list[int]:
+        """判断消息链是否含有子链.
 
-        fallback: list[int] = [0 for _ in pattern]
-        current_fb: int = 0  # current fallback index
-        for i in range(1, len(pattern)):
-            while current_fb and pattern[i] != pattern[current_fb]:
-                current_fb = fallback[current_fb - 1]
-            if pattern[i] == pattern[current_fb]:
-                current_fb += 1
-            fallback[i] = current_fb
+        下标以 "单位" 计算: 文字中的每个字符与每个非文字元素各占一个单位.
+        匹配直接在文字段上使用 `str.find` 进行, 仅在跨越非文字元素时逐段比较.
 
+        Args:
+            sub (MessageChain | Sequence[str | Element]): 要判断的子链.
+
+        Returns:
+            List[int]: 所有找到的下标.
+        """
+        p_texts, p_elements = self._split_segments(sub._content if isinstance(sub, MessageChain) else sub)
+        texts, elements = self._segments()
         match_index: list[int] = []
-        ptr = 0
-        for i, e in enumerate(match_target):
-            while ptr and e != pattern[ptr]:
-                ptr = fallback[ptr - 1]
-            if e == pattern[ptr]:
-                ptr += 1
-            if ptr == len(pattern):
-                match_index.append(i - ptr + 1)
-                ptr = fallback[ptr - 1]
+
+        if not p_elements:
+            needle = p_texts[0]
+            if not needle:
+                return match_index
+            offset = 0
+            for text in texts:
+                pos = text.find(needle)
+                while pos != -1:
+                    match_index.append(offset + pos)
+                    pos = text.find(needle, pos + 1)
+                offset += len(text) + 1
+            return match_index
+
+        head, tail, middle = p_texts[0], p_texts[-1], p_texts[1:-1]
+        size = len(p_elements)
+        offset = 0
+        for i in range(len(elements) - size + 1):
+            offset += len(texts[i])
+            if (
+                texts[i].endswith(head)
+                and texts[i + size].startswith(tail)
+                and all(elements[i + j] == p_elements[j] for j in range(size))
+                and all(texts[i + j + 1] == middle[j] for j in range(size - 1))
+            ):
+                match_index.append(offset - len(head))
+            offset += 1
         return match_index
 
     def removeprefix(self, prefix: str, *, copy: bool = True) -> Self:
@@ -484,21 +1032,17 @@ class MessageChain:
         Returns:
             MessageChain: 修改后的消息链, 若未移除则原样返回.
         """
-        elements = deepcopy(self.content) if copy else self.content
-        if not elements:
+        if not self._content:
             return self.copy() if copy else self
-        elem = elements[0]
-        if not isinstance(elem, Text):
+        elem = self._content[0]
+        if not isinstance(elem, Text) or not elem.text.startswith(prefix):
             return self.copy() if copy else self
-        if elem.text.startswith(prefix):
-            elem.text = elem.text[len(prefix) :]
-            if not elem.text:
-                elements.pop(0)
-        if copy:
-            return self.__class__(elements)
-        self.content.clear()
-        self.content.extend(elements)
-        return self
+        elements = self._content.copy() if copy else self._own()
+        if text := elem.text[len(prefix) :]:
+            elements[0] = elem._with_text(text)
+        else:
+            elements.pop(0)
+        return self._derive(elements) if copy else self
 
     def removesuffix(self, suffix: str, *, copy: bool = True) -> Self:
         """移除消息链后缀.
@@ -510,74 +1054,148 @@ class MessageChain:
         Returns:
             MessageChain: 修改后的消息链, 若未移除则原样返回.
         """
-        elements = deepcopy(self.content) if copy else self.content
-        if not elements:
+        if not self._content:
             return self.copy() if copy else self
-        elem = elements[-1]
-        if not isinstance(elem, Text):
+        elem = self._content[-1]
+        if not isinstance(elem, Text) or not elem.text.endswith(suffix):
             return self.copy() if copy else self
-        if elem.text.endswith(suffix):
-            elem.text = elem.text[: -len(suffix)]
-            if not elem.text:
-                elements.pop(-1)
-        if copy:
-            return self.__class__(elements)
-        self.content.clear()
-        self.content.extend(elements)
-        return self
+        elements = self._content.copy() if copy else self._own()
+        if text := elem.text[: len(elem.text) - len(suffix)]:
+            elements[-1] = elem._with_text(text)
+        else:
+            elements.pop(-1)
+        return self._derive(elements) if copy else self
 
     def strip(self, *elements: str | type[Element] | Element, copy: bool = True) -> Self:
-        return self.lstrip(*elements, copy=copy).rstrip(*elements, copy=copy)
+        return self.lstrip(*elements, copy=copy).rstrip(*elements, copy=False)
 
     def lstrip(self, *elements: str | type[Element] | Element, copy: bool = True) -> Self:
         types = [i for i in elements if not isinstance(i, str)] or []
         chars = "".join([i for i in elements if isinstance(i, str)]) or None
-        content = deepcopy(self.content) if copy else self.content
-        if not content:
-            return self.copy() if copy else self
-        while content:
-            elem = content[0]
+        content = self._content
+        index = 0
+        head = None
+        while index < len(content):
+            elem = content[index]
             if elem in types or elem.__class__ in types:
-                content.pop(0)
+                index += 1
             elif isinstance(elem, Text):
                 text = elem.text.lstrip(chars)
                 if not text:
-                    content.pop(0)
+                    index += 1
                     continue
-                elem.text = text
+                if len(text) != len(elem.text):
+                    head = elem._with_text(text)
                 break
             else:
                 break
-        if copy:
-            return self.__class__(content)
-        self.content.clear()
-        self.content.extend(content)
-        return self
+        if not index and head is None:
+            return self.copy() if copy else self
+        content = content[index:] if copy else self._own()
+        if not copy:
+            del content[:index]
+        if head is not None:
+            content[0] = head
+        return self._derive(content) if copy else self
 
     def rstrip(self, *elements: str | type[Element] | Element, copy: bool = True) -> Self:
         types = [i for i in elements if not isinstance(i, str)] or []
         chars = "".join([i for i in elements if isinstance(i, str)]) or None
-        content = deepcopy(self.content) if copy else self.content
-        if not content:
-            return self.copy() if copy else self
-        while content:
-            elem = content[-1]
+        content = self._content
+        index = len(content)
+        tail = None
+        while index:
+            elem = content[index - 1]
             if elem in types or elem.__class__ in types:
-                content.pop(-1)
+                index -= 1
             elif isinstance(elem, Text):
                 text = elem.text.rstrip(chars)
                 if not text:
-                    content.pop(-1)
+                    index -= 1
                     continue
-                elem.text = text
+                if len(text) != len(elem.text):
+                    tail = elem._with_text(text)
                 break
             else:
                 break
-        if copy:
-            return self.__class__(content)
-        self.content.clear()
-        self.content.extend(content)
-        return self
+        if index == len(content) and tail is None:
+            return self.copy() if copy else self
+        content = content[:index] if copy else self._own()
+        if not copy:
+            del content[index:]
+        if tail is not None:
+            content[-1] = tail
+        return self._derive(content) if copy else self
+
+    def _splice(self, spans: Iterable[tuple[int, int, Sequence[Element]]]) -> Self:
+        """将若干个区间替换为给出的元素, 返回新的消息链.
+
+        区间以 `index_sub` 中的 "单位" 计算, 须按顺序给出且互不重叠.
+        结果中相邻的文字会被合并, 且不会产生空的 Text 元素; 未被拆分的 Text 元素将原样保留.
+
+        Args:
+            spans (Iterable[tuple[int, int, Sequence[Element]]]): (起始, 结束, 替换内容) 的序列.
+        """
+        content = self._content
+        result: list[Element] = []
+        pending: list[str] = []
+        whole: Text | None = None
+
+        def flush():
+            nonlocal whole
+            if pending:
+                result.append(whole if whole is not None else self._text_class("".join(pending)))
+                pending.clear()
+                whole = None
+
+        def emit_text(text: str, elem: Text | None = None):
+            nonlocal whole
+            if text:
+                whole = None if pending else elem
+                pending.append(text)
+
+        def emit(elem: Element):
+            if isinstance(elem, Text):
+                emit_text(elem.text, elem)
+            else:
+                flush()
+                result.append(elem)
+
+        index = offset = inner = 0
+        for start, end, replacement in spans:
+            while index < len(content):
+                elem = content[index]
+                size = len(elem.text) if isinstance(elem, Text) else 1
+                if offset + size > start:
+                    if start > offset + inner:
+                        emit_text(elem.text[inner : start - offset])  # type: ignore
+                    break
+                if inner:
+                    emit_text(elem.text[inner:])  # type: ignore
+                else:
+                    emit(elem)
+                offset += size
+                index += 1
+                inner = 0
+            for elem in replacement:
+                emit(elem)
+            while index < len(content):
+                elem = content[index]
+                size = len(elem.text) if isinstance(elem, Text) else 1
+                if offset + size > end:
+                    inner = end - offset
+                    break
+                offset += size
+                index += 1
+                inner = 0
+        if index < len(content):
+            if inner:
+                emit_text(content[index].text[inner:])  # type: ignore
+                index += 1
+            for elem in content[index:]:
+                emit(elem)
+        flush()
+        return self._derive(result)
 
     def replace(
         self,
@@ -586,6 +1204,8 @@ class MessageChain:
     ) -> Self:
         """替换消息链中的一部分. (在副本上操作)
 
+        与 `str.replace` 相同, 重叠的出现位置只会替换最先出现的那一个.
+
         Args:
             old (MessageChain): 要替换的消息链.
             new (MessageChain): 替换后的消息链.
@@ -593,45 +1213,41 @@ class MessageChain:
         Returns:
             MessageChain: 修改后的消息链, 若未替换则原样返回.
         """
-        if not isinstance(old, MessageChain):
-            old = MessageChain(old)
-        if not isinstance(new, MessageChain):
-            new = MessageChain(new)
-        index_list: list[int] = self.index_sub(old)
-
-        def unzip(chain: MessageChain) -> list[str | Element]:
-            unzipped: list[str | Element] = []
-            for e in chain.content:
-                if isinstance(e, Text):
-                    unzipped.extend(e.text)
-                else:
-                    unzipped.append(e)
-            return unzipped
-
-        unzipped_new: list[str | Element] = unzip(new)
-        unzipped_old: list[str | Element] = unzip(old)
-        unzipped_self: list[str | Element] = unzip(self)
-        unzipped_result: list[str | Element] = []
-        last_end: int = 0
-        for start in index_list:
-            unzipped_result.extend(unzipped_self[last_end:start])
-            last_end = start + len(unzipped_old)
-            unzipped_result.extend(unzipped_new)
-        unzipped_result.extend(unzipped_self[last_end:])
-
-        # Merge result
-        result_list: list[Element] = []
-        char_stk: list[str] = []
-        for v in unzipped_result:
-            if isinstance(v, str):
-                char_stk.append(v)
-            else:
-                result_list.append(self._text_class("".join(char_stk)))
-                char_stk = []
-                result_list.append(v)
-        if char_stk:
-            result_list.append(self._text_class("".join(char_stk)))
-        return self.__class__(result_list)
+        old_texts, old_elements = self._split_segments(old._content if isinstance(old, MessageChain) else old)
+        size = sum(map(len, old_texts)) + len(old_elements)
+        if isinstance(new, MessageChain):
+            replacement = new._content
+        else:
+            replacement = [self._text_class(e) if isinstance(e, str) else e for e in new]
+        spans: list[tuple[int, int, Sequence[Element]]] = []
+        last_end = 0
+        for start in self.index_sub(old):
+            if start >= last_end:
+                last_end = start + size
+                spans.append((start, last_end, replacement))
+        return self._splice(spans) if spans else self.copy()
+
+    def replace_many(
+        self,
+        mapping: Mapping[str, Replacement] | Iterable[tuple[Pattern, Replacement]],
+    ) -> Self:
+        """在一次扫描中进行多组替换. (在副本上操作)
+
+        重叠的出现位置中优先替换起始位置靠前的, 起始位置相同时优先替换较长的.
+        若同一组替换需要反复使用, 可直接使用 `ChainMatcher` 以避免重复编译.
+
+        Args:
+            mapping (Mapping | Iterable[tuple]): 要替换的内容与替换后内容的映射, 或由二者组成的序列.
+
+        Returns:
+            MessageChain: 修改后的消息链, 若未替换则原样返回.
+        """
+        from .matcher import ChainMatcher
+
+        pairs = list(mapping.items() if isinstance(mapping, Mapping) else mapping)
+        if not pairs:
+            return self.copy()
+        return ChainMatcher(old for old, _ in pairs).replace(self, [new for _, new in pairs])
 
     def __add__(self, content: MessageChain | list[Element] | Element | str) -> Self:
         if isinstance(content, str):
@@ -639,8 +1255,8 @@ class MessageChain:
         if isinstance(content, Element):
             content = [content]
         if isinstance(content, MessageChain):
-            content = content.content
-        return type(self)(self.content + content)
+            content = content._content
+        return self._derive(self._content + [self._text_class(e) if isinstance(e, str) else e for e in content])
 
     def __radd__(self, content: MessageChain | list[Element] | Element | str) -> Self:
         if isinstance(content, str):
@@ -648,8 +1264,8 @@ class MessageChain:
         if isinstance(content, Element):
             content = [content]
         if isinstance(content, MessageChain):
-            content = content.content
-        return type(self)(content + self.content)
+            content = content._content
+        return self._derive([self._text_class(e) if isinstance(e, str) else e for e in content] + self._content)
 
     def __iadd__(self, content: MessageChain | list[Element] | Element | str) -> Self:
         if isinstance(content, str):
@@ -657,14 +1273,15 @@ class MessageChain:
         if isinstance(content, Element):
             content = [content]
         if isinstance(content, MessageChain):
-            content = content.content
-        self.content.extend(content)
-        return self
+            content = content._content
+        return self._push([self._text_class(e) if isinstance(e, str) else e for e in content])
 
     def __bool__(self):
-        return bool(self.content and str(self))
+        if self._cacheable() and self._text_cache is not None:
+            return bool(self._text_cache)
+        return any(map(str, self._content))
 
     def __eq__(self, other):
         if not isinstance(other, MessageChain):
             return False
-        return other.content == self.content
+        return other._content == self._content
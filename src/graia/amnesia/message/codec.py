@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar, Union
+
+from .chain import MessageChain
+from .element import Element, FrozenText, Text, Unknown
+
+E = TypeVar("E", bound=Element)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+MAGIC = b"AMC"
+VERSION = 1
+
+_KIND_CHAIN = 0
+_KIND_BATCH = 1
+
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+_json_decoder = json.JSONDecoder()
+
+
+def _varint(value: int) -> bytes:
+    if value < 0x80:
+        return bytes((value,))
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _truncated() -> ValueError:
+    return ValueError("encoded data is truncated")
+
+
+def _read_varint(view: memoryview, pos: int) -> tuple[int, int]:
+    if pos >= len(view):
+        raise _truncated()
+    byte = view[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    value = shift = 0
+    while True:
+        if pos >= len(view):
+            raise _truncated()
+        byte = view[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode()
+    return _varint(len(data)) + data
+
+
+def _unpack_str(view: memoryview, pos: int) -> tuple[str, int]:
+    size, pos = _read_varint(view, pos)
+    if pos + size > len(view):
+        raise _truncated()
+    return str(view[pos : pos + size], "utf-8"), pos + size
+
+
+class ChainCodec:
+    """消息链的紧凑二进制编码.
+
+    每个元素被编码为 `标签 | 长度 | 内容`, 内容的格式由注册的编解码函数决定;
+    数据头包含魔数与格式版本, 版本不符时将拒绝解码. 解码直接在 `memoryview` 上进行, 不会复制输入.
+
+    内置支持 `Text`, `FrozenText` 与 `Unknown`, 其他元素需通过 `register` 注册.
+
+    `Unknown.raw_data` 以 JSON 编码, 因此只能包含 JSON 支持的值, 否则编码时抛出 ValueError;
+    且往返后元组会变为列表, 非字符串的键会变为字符串. 需要保留这些类型时, 可以用新的标签为 `Unknown` 重新注册编解码函数.
+    """
+
+    chain_class: type[MessageChain]
+
+    def __init__(self, chain_class: type[MessageChain] = MessageChain) -> None:
+        self.chain_class = chain_class
+        self._encoders: dict[type[Element], tuple[bytes, Callable[[Any], bytes]]] = {}
+        self._decoders: dict[int, Callable[[memoryview], Element]] = {}
+        self.register(1, Text, self._encode_text, self._decode_text)
+        self.register(2, FrozenText, self._encode_text, self._decode_frozen_text)
+        self.register(3, Unknown, self._encode_unknown, self._decode_unknown)
+
+    def register(
+        self,
+        tag: int,
+        element_class: type[E],
+        encoder: Callable[[E], bytes],
+        decoder: Callable[[memoryview], E],
+    ) -> None:
+        """注册一种元素的编解码函数.
+
+        Args:
+            tag (int): 元素在数据中的标签, 不能与已注册的标签重复; 1 至 15 保留给内置元素.
+            element_class (type[E]): 元素类型, 其未注册的子类也会使用该编码.
+            encoder (Callable[[E], bytes]): 将元素编码为字节串的函数.
+            decoder (Callable[[memoryview], E]): 从 `memoryview` 解码出元素的函数.
+        """
+        if tag <= 0:
+            raise ValueError(f"tag must be positive, got {tag}")
+        if tag in self._decoders:
+            raise ValueError(f"tag {tag} is already registered")
+        self._encoders[element_class] = (_varint(tag), encoder)
+        self._decoders[tag] = decoder
+
+    def _encoder(self, element_class: type[Element]) -> tuple[bytes, Callable[[Any], bytes]]:
+        for cls in element_class.__mro__:
+            if cls in self._encoders:
+                self._encoders[element_class] = self._encoders[cls]
+                return self._encoders[cls]
+        raise TypeError(f"no codec is registered for {element_class.__name__}")
+
+    @staticmethod
+    def _encode_text(element: Text) -> bytes:
+        if element.style is None:
+            return b"\x00" + element.text.encode()
+        return b"\x01" + _pack_str(element.style) + element.text.encode()
+
+    def _decode_text(self, view: memoryview) -> Text:
+        if view[0]:
+            style, pos = _unpack_str(view, 1)
+            return self.chain_class._text_class(str(view[pos:], "utf-8"), style)
+        return self.chain_class._text_class(str(view[1:], "utf-8"))
+
+    def _decode_frozen_text(self, view: memoryview) -> FrozenText:
+        if view[0]:
+            style, pos = _unpack_str(view, 1)
+            return FrozenText(str(view[pos:], "utf-8"), style)
+        return FrozenText(str(view[1:], "utf-8"))
+
+    @staticmethod
+    def _encode_unknown(element: Unknown) -> bytes:
+        try:
+            raw = _json_encoder.encode(element.raw_data)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"raw_data of {element!r} cannot be encoded as JSON: {e}") from None
+        return _pack_str(element.type) + raw.encode()
+
+    @staticmethod
+    def _decode_unknown(view: memoryview) -> Unknown:
+        type, pos = _unpack_str(view, 0)
+        return Unknown(type, _json_decoder.decode(str(view[pos:], "utf-8")))
+
+    def _write_chain(self, out: bytearray, chain: MessageChain) -> None:
+        encoders = self._encoders
+        content = chain._content
+        out += _varint(len(content))
+        for element in content:
+            tag, encoder = encoders.get(element.__class__) or self._encoder(element.__class__)
+            payload = encoder(element)
+            out += tag
+            out += _varint(len(payload))
+            out += payload
+
+    def _read_chain(self, view: memoryview, pos: int) -> tuple[MessageChain, int]:
+        decoders = self._decoders
+        text_class = self.chain_class._text_class
+        end = len(view)
+        count, pos = _read_varint(view, pos)
+        content: list[Element] = []
+        for _ in range(count):
+            if pos + 2 <= end and (tag := view[pos]) < 0x80 and (size := view[pos + 1]) < 0x80:
+                pos += 2
+            else:
+                tag, pos = _read_varint(view, pos)
+                size, pos = _read_varint(view, pos)
+            if pos + size > end:
+                raise _truncated()
+            if tag == 1 and size and not view[pos]:
+                content.append(text_class(str(view[pos + 1 : pos + size], "utf-8")))
+            elif decoder := decoders.get(tag):
+                try:
+                    content.append(decoder(view[pos : pos + size]))
+                except IndexError as e:
+                    raise ValueError(f"malformed payload for element tag {tag}") from e
+            else:
+                raise ValueError(f"unknown element tag {tag}")
+            pos += size
+        return self.chain_class._build(content), pos
+
+    def _read_header(self, data: Buffer, kind: int) -> memoryview:
+        view = memoryview(data)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        if len(view) < 5 or view[:3] != MAGIC:
+            raise ValueError("not an encoded message chain")
+        if view[3] != VERSION:
+            raise ValueError(f"unsupported codec version {view[3]}")
+        if view[4] != kind:
+            raise ValueError("encoded data is a batch" if view[4] == _KIND_BATCH else "encoded data is not a batch")
+        return view
+
+    @staticmethod
+    def _check_end(view: memoryview, pos: int) -> None:
+        if pos != len(view):
+            raise ValueError(f"{len(view) - pos} unexpected trailing bytes after encoded data")
+
+    def encode(self, chain: MessageChain) -> bytes:
+        """将单条消息链编码为字节串."""
+        out = bytearray(MAGIC)
+        out += bytes((VERSION, _KIND_CHAIN))
+        self._write_chain(out, chain)
+        return bytes(out)
+
+    def decode(self, data: Buffer) -> MessageChain:
+        """从字节串或 `memoryview` 解码单条消息链.
+
+        Raises:
+            ValueError: 数据不完整, 格式错误或在末尾存在多余的字节.
+        """
+        view = self._read_header(data, _KIND_CHAIN)
+        chain, pos = self._read_chain(view, 5)
+        self._check_end(view, pos)
+        return chain
+
+    def encode_many(self, chains: Iterable[MessageChain]) -> bytes:
+        """将多条消息链编码为一个字节串."""
+        body = bytearray()
+        count = 0
+        for chain in chains:
+            self._write_chain(body, chain)
+            count += 1
+        out = bytearray(MAGIC)
+        out += bytes((VERSION, _KIND_BATCH))
+        out += _varint(count)
+        out += body
+        return bytes(out)
+
+    def decode_many(self, data: Buffer) -> list[MessageChain]:
+        """解码由 `encode_many` 编码的多条消息链.
+
+        Raises:
+            ValueError: 数据不完整, 格式错误或在末尾存在多余的字节.
+        """
+        view = self._read_header(data, _KIND_BATCH)
+        count, pos = _read_varint(view, 5)
+        result: list[MessageChain] = []
+        for _ in range(count):
+            chain, pos = self._read_chain(view, pos)
+            result.append(chain)
+        self._check_end(view, pos)
+        return result
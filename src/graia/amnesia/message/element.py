@@ -1,14 +1,79 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from copy import copy
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, ClassVar
+from typing_extensions import Self
 
 if TYPE_CHECKING:
     from . import MessageChain
 
 
+def _no_state(element: Element) -> tuple[()]:
+    return ()
+
+
+_MUTATIONS = [0]  # 受追踪的元素被修改的总次数, 消息链以此判断依赖于元素内容的缓存是否仍然有效
+
+
+def _tracked_setattr(self: Element, name: str, value: Any) -> None:
+    if hasattr(self, name):  # 构造时的首次赋值不算作修改
+        _MUTATIONS[0] += 1
+    object.__setattr__(self, name, value)
+
+
+def _tracked_delattr(self: Element, name: str) -> None:
+    _MUTATIONS[0] += 1
+    object.__delattr__(self, name)
+
+
 class Element:
+    __slots__ = ()
+    __state_slots__: ClassVar[tuple[str, ...]] = ()
+    _state_names: ClassVar[frozenset[str]] = frozenset()
+    _state_getter: ClassVar[Callable[[Element], Any]] = staticmethod(_no_state)
+    _has_dict: ClassVar[bool] = False
+    _immutable: ClassVar[bool] = False  # 实例创建后不可修改
+    # 实例的修改会被追踪, 子类可以设置为 True 来启用. 消息链只对完全由不可修改或受追踪的元素组成的内容缓存渲染结果
+    _tracked: ClassVar[bool] = False
+
     _chain_class: type[MessageChain]
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        slots: list[str] = []
+        for klass in reversed(cls.__mro__):
+            names = klass.__dict__.get("__slots__", ())
+            for name in (names,) if isinstance(names, str) else names:
+                if not name.startswith("_") and name not in slots:
+                    slots.append(name)
+        cls.__state_slots__ = tuple(slots)
+        cls._state_names = frozenset(slots)
+        cls._state_getter = staticmethod(attrgetter(*slots) if slots else _no_state)
+        cls._has_dict = cls.__dictoffset__ != 0
+        if cls.__dict__.get("_tracked") and "__setattr__" not in cls.__dict__:
+            cls.__setattr__ = _tracked_setattr  # type: ignore
+            cls.__delattr__ = _tracked_delattr  # type: ignore
+
+    def _state(self) -> dict[str, Any]:
+        """收集元素的全部状态, 包括 `__slots__` 与 `__dict__` 中的属性."""
+        state = {name: getattr(self, name) for name in self.__state_slots__ if hasattr(self, name)}
+        if (attrs := getattr(self, "__dict__", None)) is not None:
+            state.update(attrs)
+        return state
+
+    def __setstate__(self, state: Any) -> None:
+        """从 pickle 的数据中恢复状态.
+
+        使用 `__slots__` 前的版本以 `__dict__` 保存全部属性, 现在则为 `(__dict__, slots)` 二元组, 两种格式都可以读取.
+        """
+        if isinstance(state, tuple):
+            attrs, slots = state
+            state = {**(attrs or {}), **(slots or {})}
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     def __str__(self) -> str:
         return ""
 
@@ -20,7 +85,7 @@ class Element:
         if isinstance(content, Element):
             content = [content]
         if isinstance(content, MessageChain):
-            content = content.content
+            content = content._content
         return self._chain_class([*content, self])
 
     def __radd__(self: Element, content: MessageChain | list[Element] | Element | str) -> MessageChain:
@@ -31,18 +96,35 @@ class Element:
         if isinstance(content, Element):
             content = [content]
         if isinstance(content, MessageChain):
-            content = content.content
+            content = content._content
         return self._chain_class([self, *content])
 
     def __eq__(self, other):
-        if not isinstance(other, Element):
-            return False
-        return vars(self) == vars(other)
+        if self is other:
+            return True
+        cls = self.__class__
+        if other.__class__ is not cls:
+            if not isinstance(other, Element):
+                return False
+            if cls._has_dict or other._has_dict:
+                return self._state() == other._state()
+            if cls._state_names != other._state_names:
+                return False
+        try:
+            getter = cls._state_getter
+            if getter(self) != getter(other):
+                return False
+        except AttributeError:  # 存在未赋值的属性
+            return self._state() == other._state()
+        return not cls._has_dict or self.__dict__ == other.__dict__
 
 
 class Text(Element):
+    __slots__ = ("text", "style")
+
     text: str
     style: str | None
+    _tracked: ClassVar[bool] = True
 
     def __init__(self, text: str, style: str | None = None) -> None:
         """实例化一个 Text 消息元素, 用于承载消息中的文字.
@@ -51,26 +133,117 @@ class Text(Element):
             text (str): 元素所包含的文字
             style (Optional[str]): 默认为空, 文字的样式
         """
-        self.text = text
-        self.style = style
+        _set_text(self, text)
+        _set_style(self, style)
 
     def __str__(self) -> str:
         return self.text
 
+    def _with_text(self, text: str) -> Self:
+        """创建一个仅有文字不同的副本, 而不修改自身."""
+        if self.__class__ is Text:
+            return self.__class__(text, self.style)
+        elem = copy(self)
+        _set_text(elem, text)
+        return elem
+
+    def __eq__(self, other):
+        if self.__class__ is Text and other.__class__ is Text:
+            return self.text == other.text and self.style == other.style
+        if isinstance(other, Text) and self.text != other.text:
+            return False
+        return super().__eq__(other)
+
     def __repr__(self) -> str:
         return f"Text(text={self.text}{f', style={self.style}' if self.style else ''})"
 
 
+# 构造时直接写入 slot, 跳过 `__setattr__` 中的修改追踪
+_set_text = Text.__dict__["text"].__set__
+_set_style = Text.__dict__["style"].__set__
+
+
+class FrozenText(Text):
+    """不可变且可哈希的 Text 消息元素, 哈希值在创建时计算.
+
+    可以作为字典的键或放入集合中, 适合大量保存与去重; 通过 `FrozenText.intern` 可以复用常见文字 (如单个空格, 换行) 的实例.
+    """
+
+    __slots__ = ("_hash",)
+
+    _hash: int
+    _immutable: ClassVar[bool] = True
+    _pool: ClassVar[dict[tuple[type, str, str | None], Any]] = {}
+    _pool_size: ClassVar[int] = 4096
+
+    def __init__(self, text: str, style: str | None = None) -> None:
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "style", style)
+        object.__setattr__(self, "_hash", hash((text, style)))
+
+    @classmethod
+    def intern(cls, text: str, style: str | None = None) -> Self:
+        """获取驻留的实例, 相同内容的文字将共享同一个实例.
+
+        驻留池的容量由 `_pool_size` 限制, 超出后将直接创建新的实例.
+        """
+        key = (cls, text, style)
+        elem = cls._pool.get(key)
+        if elem is None:
+            elem = cls(text, style)
+            if len(cls._pool) < cls._pool_size:
+                cls._pool[key] = elem
+        return elem
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if other.__class__ is self.__class__:
+            return self._hash == other._hash and self.text == other.text and self.style == other.style
+        return super().__eq__(other)
+
+    def __reduce__(self):
+        return self.__class__, (self.text, self.style)
+
+    def __copy__(self) -> Self:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> Self:
+        return self
+
+    def _with_text(self, text: str) -> Self:
+        return self.__class__(text, self.style)
+
+    def __repr__(self) -> str:
+        return f"FrozenText(text={self.text}{f', style={self.style}' if self.style else ''})"
+
+
 class Unknown(Element):
+    __slots__ = ("type", "raw_data")
+
     type: str
     raw_data: Any
+    _tracked: ClassVar[bool] = True
 
     def __init__(self, type: str, raw_data: Any) -> None:
-        self.type = type
-        self.raw_data = raw_data
+        _set_type(self, type)
+        _set_raw_data(self, raw_data)
 
     def __str__(self) -> str:
         return f"[$Unknown:type={self.type}]"
 
     def __repr__(self) -> str:
         return f"Unknown(type={self.type}, raw=<{self.raw_data.__class__.__name__}>)"
+
+
+_set_type = Unknown.__dict__["type"].__set__
+_set_raw_data = Unknown.__dict__["raw_data"].__set__
@@ -2,10 +2,53 @@ from __future__ import annotations
 
 import re
 from collections.abc import Sequence
-from typing import ClassVar
+from functools import lru_cache
+from string import Formatter as _StringFormatter
+from typing import ClassVar, Union
 
 from graia.amnesia.message import MessageChain
-from graia.amnesia.message.element import Element
+from graia.amnesia.message.element import Element, Text
+
+Segment = tuple[str, Union[int, str, None]]
+
+_SPLIT_PATTERN = re.compile("([\x02\x03][\\d\\w]+[\x02\x03])")
+_FIELD_PATTERN = re.compile("(?P<header>[\x02\x03])(?P<content>\\w+)(?P=header)")
+
+
+@lru_cache(maxsize=1024)
+def _compile(format_string: str) -> tuple[Segment, ...] | None:
+    """将模板解析为 (文字, 占位符) 的序列, 结果按模板缓存.
+
+    占位符为 int 时代表位置参数, 为 str 时代表关键字参数, 最后一项的占位符总为 None.
+    若模板中使用了格式说明, 转换或属性访问, 则返回 None.
+    """
+    segments: list[Segment] = []
+    auto: int | None = None
+    manual = False
+    literal = ""
+    for text, field, spec, conversion in _StringFormatter().parse(format_string):
+        literal += text
+        if field is None:
+            continue
+        if spec or conversion:
+            return None
+        if not field:
+            if manual:
+                raise ValueError("cannot switch from manual field specification to automatic field numbering")
+            auto = 0 if auto is None else auto + 1
+            segments.append((literal, auto))
+        elif field.isdigit():
+            if auto is not None:
+                raise ValueError("cannot switch from automatic field numbering to manual field specification")
+            manual = True
+            segments.append((literal, int(field)))
+        elif field.isidentifier():
+            segments.append((literal, field))
+        else:
+            return None
+        literal = ""
+    segments.append((literal, None))
+    return tuple(segments)
 
 
 class Formatter:
@@ -31,6 +74,46 @@ class Formatter:
             return list(obj)
 
     def format(self, *o_args: Element | MessageChain | str, **o_kwargs: Element | MessageChain | str) -> MessageChain:
+        segments = _compile(self.format_string)
+        if segments is None:
+            return self._format_fallback(*o_args, **o_kwargs)
+
+        chain_class = self.__message_chain_class__
+        result: list[Element] = []
+        texts: list[str] = []
+        for literal, field in segments:
+            texts.append(literal)
+            if field is None:
+                continue
+            if isinstance(field, int):
+                if field >= len(o_args):
+                    raise IndexError(f"Replacement index {field} out of range for positional args tuple")
+                value = o_args[field]
+            else:
+                value = o_kwargs[field]
+            if isinstance(value, str):
+                texts.append(value)
+                continue
+            elements = (
+                value._content if isinstance(value, MessageChain) else (value,) if isinstance(value, Element) else value
+            )
+            for elem in elements:
+                if isinstance(elem, Text):
+                    texts.append(elem.text)
+                elif isinstance(elem, str):
+                    texts.append(elem)
+                else:
+                    if texts:
+                        result.append(chain_class._text_class("".join(texts)))
+                        texts = []
+                    result.append(elem)
+        if texts:
+            result.append(chain_class._text_class("".join(texts)))
+        return chain_class._build(result)
+
+    def _format_fallback(
+        self, *o_args: Element | MessageChain | str, **o_kwargs: Element | MessageChain | str
+    ) -> MessageChain:
         args: list[list[Element]] = [self.extract_chain(e) for e in o_args]
         kwargs: dict[str, list[Element]] = {k: self.extract_chain(e) for k, e in o_kwargs.items()}
 
@@ -41,8 +124,8 @@ class Formatter:
 
         chain_list: list[Element] = []
 
-        for i in re.split("([\x02\x03][\\d\\w]+[\x02\x03])", result):
-            if match := re.fullmatch("(?P<header>[\x02\x03])(?P<content>\\w+)(?P=header)", i):
+        for i in _SPLIT_PATTERN.split(result):
+            if match := _FIELD_PATTERN.fullmatch(i):
                 header = match["header"]
                 full: str = match[0]
                 if header == "\x02":  # from args
@@ -51,4 +134,4 @@ class Formatter:
                     chain_list.extend(kwargs_mapping[full])
             else:
                 chain_list.append(self.ensure_element(i))
-        return MessageChain(chain_list).merge()
+        return self.__message_chain_class__(chain_list).merge(copy=False)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import Any, overload
+from typing_extensions import Self
+
+from .chain import MessageChain
+from .element import Element, Text, Unknown
+
+
+class LazyMessageChain(MessageChain):
+    """延迟构造的消息链, 直接包装协议端传来的原始数据, 只在元素被访问时才进行解码.
+
+    `len`, 按下标取值, 迭代, `startswith`, `endswith` 与真值判断只会解码实际访问到的元素;
+    其余的 `MessageChain` 方法会先解码所有元素, 此后与普通的消息链无异.
+    """
+
+    _raw: list[Any] | None = None
+    _decoded: list[Element | None]
+    _decoder: Callable[[Any], Element]
+    _elements: list[Element]
+
+    def __init__(self, payload: list[Any] | dict[str, Any], decoder: Callable[[Any], Element] | None = None):
+        """包装原始数据.
+
+        Args:
+            payload (list[Any] | dict[str, Any]): 原始消息段的列表, 或单个消息段.
+            decoder (Callable[[Any], Element], optional): 将单个原始消息段解码为元素的函数.
+                默认将字符串解码为 Text, 其余的消息段解码为 Unknown.
+        """
+        self._raw = [payload] if isinstance(payload, dict) else payload
+        self._decoded = [None] * len(self._raw)
+        self._decoder = decoder or self._decode
+
+    def _decode(self, raw: Any) -> Element:
+        if isinstance(raw, Element):
+            return raw
+        if isinstance(raw, str):
+            return self._text_class(raw)
+        if isinstance(raw, dict):
+            return Unknown(raw.get("type", "unknown"), raw)
+        raise TypeError(f"{raw!r} is not a valid message segment")
+
+    @property
+    def _content(self) -> list[Element]:
+        if self._raw is not None:
+            decoded, decoder = self._decoded, self._decoder
+            self._elements = [e if e is not None else decoder(r) for e, r in zip(decoded, self._raw)]
+            self._raw = None
+            self._decoded = []
+        return self._elements
+
+    @_content.setter
+    def _content(self, value: list[Element]) -> None:
+        self._raw = None
+        self._elements = value
+
+    def _element(self, index: int) -> Element:
+        if self._raw is None:
+            return self._elements[index]
+        element = self._decoded[index]
+        if element is None:
+            element = self._decoded[index] = self._decoder(self._raw[index])
+        return element
+
+    @property
+    def pending(self) -> bool:
+        """是否仍有未解码的元素."""
+        return self._raw is not None
+
+    @overload
+    def __getitem__(self, item: type[Element]) -> list[Any]: ...
+
+    @overload
+    def __getitem__(self, item: int) -> Element: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> Self: ...
+
+    def __getitem__(self, item: type[Element] | int | slice) -> Any:
+        if isinstance(item, int):
+            return self._element(item)
+        return super().__getitem__(item)
+
+    def __iter__(self) -> Iterator[Element]:
+        if self._raw is None:
+            yield from self._elements
+            return
+        for index in range(len(self._decoded)):
+            yield self._element(index)
+
+    def __len__(self) -> int:
+        return len(self._decoded) if self._raw is not None else len(self._elements)
+
+    def __bool__(self) -> bool:
+        if self._raw is None:
+            return super().__bool__()
+        return any(map(str, self))
+
+    def startswith(self, string: str) -> bool:
+        if self._raw is None:
+            return super().startswith(string)
+        if not self._decoded:
+            return False
+        element = self._element(0)
+        return isinstance(element, Text) and element.text.startswith(string)
+
+    def endswith(self, string: str) -> bool:
+        if self._raw is None:
+            return super().endswith(string)
+        if not self._decoded:
+            return False
+        element = self._element(-1)
+        return isinstance(element, Text) and element.text.endswith(string)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import TypeVar, Union
+
+from .chain import MessageChain
+from .element import Element, Text
+
+Pattern = Union[str, MessageChain, Sequence[Union[str, Element]]]
+Replacement = Union[str, Element, MessageChain, Sequence[Union[str, Element]]]
+
+C = TypeVar("C", bound=MessageChain)
+
+
+class ChainMatcher:
+    """多模式匹配器, 基于 Aho-Corasick 自动机, 只需扫描一遍消息链即可找出所有模式的出现位置.
+
+    模式与 `MessageChain.index_sub` 使用相同的 "单位": 文字中的每个字符与每个非文字元素各占一个单位,
+    因此模式中也可以包含非文字元素. 编译后的匹配器可以在多条消息之间复用.
+
+    若所有模式都是纯文字, `replace` 将改用编译后的正则表达式在各个文字段上进行替换.
+    """
+
+    patterns: list[list[str | Element]]
+
+    def __init__(self, patterns: Iterable[Pattern]) -> None:
+        """编译给出的模式.
+
+        Args:
+            patterns (Iterable[str | MessageChain | Sequence[str | Element]]): 要匹配的模式, 不能为空.
+        """
+        self.patterns = [self._units(pattern) for pattern in patterns]
+        self._goto: list[dict[str, int]] = [{}]
+        self._element_goto: list[list[tuple[Element, int]]] = [[]]
+        self._output: list[list[int]] = [[]]
+        self._fail: list[int] = [0]
+        for index, units in enumerate(self.patterns):
+            if not units:
+                raise ValueError(f"pattern {index} is empty")
+            state = 0
+            for unit in units:
+                state = self._transit(state, unit) or self._insert(state, unit)
+            self._output[state].append(index)
+        self._link()
+        self._literals: dict[str, int] | None = None
+        self._regex: re.Pattern[str] | None = None
+        if all(isinstance(unit, str) for units in self.patterns for unit in units):
+            self._literals = {}
+            for index, units in enumerate(self.patterns):
+                self._literals.setdefault("".join(units), index)  # type: ignore
+            self._regex = re.compile("|".join(map(re.escape, sorted(self._literals, key=len, reverse=True))))
+
+    @staticmethod
+    def _units(pattern: Pattern) -> list[str | Element]:
+        if isinstance(pattern, str):
+            return list(pattern)
+        units: list[str | Element] = []
+        for e in pattern._content if isinstance(pattern, MessageChain) else pattern:
+            if isinstance(e, Text):
+                units.extend(e.text)
+            elif isinstance(e, str):
+                units.extend(e)
+            else:
+                units.append(e)
+        return units
+
+    def _transit(self, state: int, unit: str | Element) -> int:
+        if isinstance(unit, str):
+            return self._goto[state].get(unit, 0)
+        return next((target for elem, target in self._element_goto[state] if unit == elem), 0)
+
+    def _insert(self, state: int, unit: str | Element) -> int:
+        target = len(self._goto)
+        self._goto.append({})
+        self._element_goto.append([])
+        self._output.append([])
+        self._fail.append(0)
+        if isinstance(unit, str):
+            self._goto[state][unit] = target
+        else:
+            self._element_goto[state].append((unit, target))
+        return target
+
+    def _link(self) -> None:
+        queue = deque([*self._goto[0].values(), *(target for _, target in self._element_goto[0])])
+        while queue:
+            state = queue.popleft()
+            edges: list[tuple[str | Element, int]] = [*self._goto[state].items(), *self._element_goto[state]]
+            for unit, target in edges:
+                fallback = self._fail[state]
+                while fallback and not self._transit(fallback, unit):
+                    fallback = self._fail[fallback]
+                self._fail[target] = self._transit(fallback, unit)
+                self._output[target].extend(self._output[self._fail[target]])
+                queue.append(target)
+
+    def finditer(self, chain: MessageChain) -> Iterator[tuple[int, int, int]]:
+        """在消息链中查找所有模式的出现位置, 允许重叠.
+
+        Args:
+            chain (MessageChain): 要查找的消息链.
+
+        Yields:
+            tuple[int, int, int]: (起始单位, 结束单位, 模式下标), 按结束位置的顺序给出.
+        """
+        goto, element_goto, fail, output = self._goto, self._element_goto, self._fail, self._output
+        lengths = [len(units) for units in self.patterns]
+        state = pos = 0
+        for elem in chain._content:
+            if isinstance(elem, Text):
+                for char in elem.text:
+                    while (target := goto[state].get(char)) is None and state:
+                        state = fail[state]
+                    state = target or 0
+                    pos += 1
+                    for index in output[state]:
+                        yield pos - lengths[index], pos, index
+            else:
+                while not (target := self._transit(state, elem)) and state:
+                    state = fail[state]
+                state = target
+                pos += 1
+                for index in output[state]:
+                    yield pos - lengths[index], pos, index
+
+    def findall(self, chain: MessageChain) -> list[tuple[int, int, int]]:
+        """与 `finditer` 相同, 但以列表返回, 按起始位置排序."""
+        return sorted(self.finditer(chain))
+
+    def search(self, chain: MessageChain) -> tuple[int, int, int] | None:
+        """获取最先结束的一次匹配, 若没有任何模式出现则返回 None."""
+        return next(self.finditer(chain), None)
+
+    def replace(
+        self,
+        chain: C,
+        replacements: Sequence[Replacement] | Callable[[int], Replacement],
+    ) -> C:
+        """在一次扫描中替换所有模式的出现位置, 返回新的消息链.
+
+        重叠的匹配中优先保留起始位置靠前的, 起始位置相同时保留较长的.
+
+        Args:
+            chain (MessageChain): 要替换的消息链.
+            replacements (Sequence[Replacement] | Callable[[int], Replacement]): 与模式一一对应的替换内容,
+                或是接受模式下标并返回替换内容的函数.
+
+        Returns:
+            MessageChain: 修改后的消息链, 若未替换则返回副本.
+        """
+        spans: list[tuple[int, int, list[Element]]] = []
+        cache: dict[int, list[Element]] = {}
+        last_end = 0
+        for start, end, index in self._select(chain):
+            if start < last_end:
+                continue
+            if index not in cache:
+                replacement = replacements(index) if callable(replacements) else replacements[index]
+                cache[index] = self._elements(chain, replacement)
+            spans.append((start, end, cache[index]))
+            last_end = end
+        return chain._splice(spans) if spans else chain.copy()
+
+    def _select(self, chain: MessageChain) -> Iterable[tuple[int, int, int]]:
+        if self._regex is None or self._literals is None:
+            return sorted(self.finditer(chain), key=lambda m: (m[0], -m[1]))
+        literals = self._literals
+        result: list[tuple[int, int, int]] = []
+        offset = 0
+        for text in chain._segments()[0]:
+            for match in self._regex.finditer(text):
+                result.append((offset + match.start(), offset + match.end(), literals[match[0]]))
+            offset += len(text) + 1
+        return result
+
+    @staticmethod
+    def _elements(chain: MessageChain, replacement: Replacement) -> list[Element]:
+        if isinstance(replacement, MessageChain):
+            return replacement._content
+        if isinstance(replacement, str):
+            return [chain._text_class(replacement)]
+        if isinstance(replacement, Element):
+            return [replacement]
+        return [chain._text_class(e) if isinstance(e, str) else e for e in replacement]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from .chain import MessageChain
+
+C = TypeVar("C", bound="MessageChain")
+
+PLACEHOLDER = "\ufffc"
+"""正则匹配时代表一个非文字元素的字符 (U+FFFC OBJECT REPLACEMENT CHARACTER)."""
+
+
+class ChainMatch(Generic[C]):
+    """在消息链上进行正则匹配的结果, 与 `re.Match` 类似, 但分组以消息链的形式给出.
+
+    匹配在消息链的 "单位文本" 上进行: 文字原样保留, 每个非文字元素以一个 `PLACEHOLDER` 字符表示,
+    因此位置与 `MessageChain.index_sub` 中的单位一致.
+    """
+
+    __slots__ = ("chain", "match", "starts")
+
+    chain: C
+    match: re.Match[str]
+    starts: list[int]  # 匹配时各元素的起始单位
+
+    def __init__(self, chain: C, match: re.Match[str], starts: list[int]) -> None:
+        self.chain = chain
+        self.match = match
+        self.starts = starts
+
+    def span(self, group: int | str = 0) -> tuple[int, int]:
+        """获取分组的起止单位, 分组未参与匹配时为 (-1, -1)."""
+        return self.match.span(group)
+
+    def start(self, group: int | str = 0) -> int:
+        return self.match.start(group)
+
+    def end(self, group: int | str = 0) -> int:
+        return self.match.end(group)
+
+    def group(self, group: int | str = 0) -> C | None:
+        """获取分组对应的消息链, 分组未参与匹配时返回 None."""
+        start, end = self.match.span(group)
+        if start < 0:
+            return None
+        return self.chain._unit_slice(start, end, self.starts[-1])
+
+    def __getitem__(self, group: int | str) -> C | None:
+        return self.group(group)
+
+    def groups(self) -> tuple[C | None, ...]:
+        return tuple(self.group(index) for index in range(1, (self.match.re.groups or 0) + 1))
+
+    def groupdict(self) -> dict[str, C | None]:
+        return {name: self.group(name) for name in self.match.re.groupindex}
+
+    def locate(self, group: int | str = 0) -> tuple[tuple[int, int], tuple[int, int]]:
+        """将分组的起止位置转换为 (元素下标, 元素内的偏移) 的形式.
+
+        Returns:
+            tuple[tuple[int, int], tuple[int, int]]: 起始与结束位置, 非文字元素内的偏移总为 0.
+        """
+        start, end = self.match.span(group)
+        if start < 0:
+            raise ValueError(f"group {group!r} did not participate in the match")
+        return self.chain._locate(start, self.starts), self.chain._locate(end, self.starts)
+
+    def __repr__(self) -> str:
+        return f"<ChainMatch span={self.match.span()} match={self.match[0]!r}>"
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ..utilles import Registrar
+from .chain import MessageChain
+from .element import Element, Unknown
+
+Constructor = Callable[[dict[str, Any]], Element]
+
+
+class ElementRegistry(Registrar):
+    """消息元素的注册表, 将协议中的类型标签映射到从原始消息段构造元素的函数.
+
+    原始消息段为字典时, 以 `type_key` 对应的值查找构造函数, 未注册的类型解码为 `Unknown`;
+    字符串解码为 Text, 已经是元素的消息段原样保留.
+
+    ```python
+    registry = ElementRegistry()
+
+    @registry.register("at")
+    def _(raw: dict) -> At:
+        return At(raw["data"]["qq"])
+
+    chain = registry.decode(payload)
+    ```
+    """
+
+    type_key: str
+
+    def __init__(self, *args: Any, type_key: str = "type", **kwargs: Any) -> None:
+        """
+        Args:
+            type_key (str): 原始消息段中表示类型标签的键, 默认为 "type".
+        """
+        super().__init__(*args, **kwargs)
+        self.type_key = type_key
+
+    def decode_one(self, raw: Any) -> Element:
+        """解码单个原始消息段."""
+        if isinstance(raw, dict):
+            tag = raw.get(self.type_key, "unknown")
+            constructor = self.get(tag)
+            return Unknown(tag, raw) if constructor is None else constructor(raw)
+        if isinstance(raw, str):
+            return MessageChain._text_class(raw)
+        if isinstance(raw, Element):
+            return raw
+        raise TypeError(f"{raw!r} is not a valid message segment")
+
+    __call__ = decode_one
+
+    def decode_many(self, segments: Iterable[Any]) -> list[Element]:
+        """解码一组原始消息段, 返回元素列表."""
+        dispatch = self._lookup()
+        type_key = self.type_key
+        text_class = MessageChain._text_class
+        result: list[Element] = []
+        append = result.append
+        for raw in segments:
+            if raw.__class__ is dict:
+                tag = raw.get(type_key, "unknown")
+                constructor = dispatch(tag)
+                append(Unknown(tag, raw) if constructor is None else constructor(raw))
+            elif raw.__class__ is str:
+                append(text_class(raw))
+            else:
+                append(self.decode_one(raw))
+        return result
+
+    def decode(self, segments: Iterable[Any], chain_class: type[MessageChain] = MessageChain) -> MessageChain:
+        """将一组原始消息段解码为消息链.
+
+        Args:
+            segments (Iterable[Any]): 原始消息段.
+            chain_class (type[MessageChain]): 要创建的消息链类型.
+        """
+        return chain_class._build(self.decode_many(segments))
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any, overload
+from typing_extensions import Self
+
+from .chain import MessageChain
+from .element import Element
+
+LEAF_SIZE = 64
+
+
+class Rope:
+    """不可变的平衡二叉树 (AVL), 叶子节点存放元素元组, 用于表示很长的元素序列.
+
+    拼接与切片只会创建 O(log n) 个新节点, 其余部分在新旧树之间共享.
+    """
+
+    __slots__ = ("left", "right", "items", "length", "depth")
+
+    left: Rope | None
+    right: Rope | None
+    items: tuple[Element, ...]
+    length: int
+    depth: int
+
+    def __init__(self, left: Rope | None = None, right: Rope | None = None, items: tuple[Element, ...] = ()) -> None:
+        self.left = left
+        self.right = right
+        self.items = items
+        if left is None or right is None:
+            self.length = len(items)
+            self.depth = 0
+        else:
+            self.length = left.length + right.length
+            self.depth = max(left.depth, right.depth) + 1
+
+    @classmethod
+    def from_sequence(cls, elements: Sequence[Element]) -> Rope:
+        """将序列按 `LEAF_SIZE` 分块, 构造一棵平衡的树."""
+        leaves = [cls(items=tuple(elements[i : i + LEAF_SIZE])) for i in range(0, len(elements), LEAF_SIZE)]
+        if not leaves:
+            return EMPTY
+        while len(leaves) > 1:
+            paired = [cls(leaves[i], leaves[i + 1]) for i in range(0, len(leaves) - 1, 2)]
+            if len(leaves) % 2:
+                paired[-1] = join(paired[-1], leaves[-1])
+            leaves = paired
+        return leaves[0]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[Element]:
+        stack: list[Rope] = [self]
+        while stack:
+            node = stack.pop()
+            if node.left is None or node.right is None:
+                yield from node.items
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def __getitem__(self, index: int) -> Element:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("rope index out of range")
+        node = self
+        while node.left is not None and node.right is not None:
+            if index < node.left.length:
+                node = node.left
+            else:
+                index -= node.left.length
+                node = node.right
+        return node.items[index]
+
+    def slice(self, start: int, stop: int) -> Rope:
+        """获取 [start, stop) 范围内的子树, 下标需已经规范化."""
+        if start <= 0 and stop >= self.length:
+            return self
+        if start >= stop:
+            return EMPTY
+        if self.left is None or self.right is None:
+            return Rope(items=self.items[start:stop])
+        middle = self.left.length
+        if stop <= middle:
+            return self.left.slice(start, stop)
+        if start >= middle:
+            return self.right.slice(start - middle, stop - middle)
+        return join(self.left.slice(start, middle), self.right.slice(0, stop - middle))
+
+
+EMPTY = Rope()
+
+
+def _is_leaf(node: Rope) -> bool:
+    return node.left is None or node.right is None
+
+
+def _rotate_left(node: Rope) -> Rope:
+    right: Any = node.right
+    return Rope(Rope(node.left, right.left), right.right)
+
+
+def _rotate_right(node: Rope) -> Rope:
+    left: Any = node.left
+    return Rope(left.left, Rope(left.right, node.right))
+
+
+def _join_right(a: Rope, b: Rope) -> Rope:
+    left: Any = a.left
+    right: Any = a.right
+    if right.depth <= b.depth + 1:
+        if _is_leaf(right) and _is_leaf(b) and right.length + b.length <= LEAF_SIZE:
+            return Rope(left, Rope(items=right.items + b.items))
+        node = Rope(right, b)
+        if node.depth <= left.depth + 1:
+            return Rope(left, node)
+        return _rotate_left(Rope(left, _rotate_right(node)))
+    node = _join_right(right, b)
+    if node.depth <= left.depth + 1:
+        return Rope(left, node)
+    return _rotate_left(Rope(left, node))
+
+
+def _join_left(a: Rope, b: Rope) -> Rope:
+    left: Any = b.left
+    right: Any = b.right
+    if left.depth <= a.depth + 1:
+        if _is_leaf(left) and _is_leaf(a) and left.length + a.length <= LEAF_SIZE:
+            return Rope(Rope(items=a.items + left.items), right)
+        node = Rope(a, left)
+        if node.depth <= right.depth + 1:
+            return Rope(node, right)
+        return _rotate_right(Rope(_rotate_left(node), right))
+    node = _join_left(a, left)
+    if node.depth <= right.depth + 1:
+        return Rope(node, right)
+    return _rotate_right(Rope(node, right))
+
+
+def join(a: Rope, b: Rope) -> Rope:
+    """拼接两棵树, 并保持平衡."""
+    if not a.length:
+        return b
+    if not b.length:
+        return a
+    if a.depth > b.depth + 1:
+        return _join_right(a, b)
+    if b.depth > a.depth + 1:
+        return _join_left(a, b)
+    if _is_leaf(a) and _is_leaf(b) and a.length + b.length <= LEAF_SIZE:
+        return Rope(items=a.items + b.items)
+    return Rope(a, b)
+
+
+class RopeMessageChain(MessageChain):
+    """以 `Rope` 存储元素的消息链, 适合由大量子消息链拼接成很长的消息 (如合并转发).
+
+    `+`, `+=`, `append`, `extend`, 切片, `len` 与按下标取值都直接在树上进行, 为 O(log n);
+    只有在迭代或调用其他需要完整列表的方法时才会将树展开为列表, 展开后的列表会被缓存直到下一次修改.
+    """
+
+    _rope: Rope | None = None
+    _flat: list[Element] | None = None
+
+    def __init__(self, elements: Sequence[str | Element] | MessageChain):
+        """从传入的序列或消息链创建消息链.
+
+        Args:
+            elements (Sequence[str | Element] | MessageChain): 包含且仅包含消息元素和字符串的序列, 或是另一条消息链.
+        """
+        if isinstance(elements, RopeMessageChain):
+            self._rope = elements._tree()
+        elif isinstance(elements, MessageChain):
+            self._rope = Rope.from_sequence(elements._content)
+        else:
+            super().__init__(elements)
+
+    @property
+    def _content(self) -> list[Element]:
+        if self._flat is None:
+            self._flat = list(self._rope or EMPTY)
+            if self._exposed:
+                # 展开的列表可能会通过 `content` 被修改, 此时立即建立快照, `_tree` 才能据此判断树是否仍然有效
+                self._snapshot = self._flat.copy()
+        return self._flat
+
+    @_content.setter
+    def _content(self, value: list[Element]) -> None:
+        self._flat = value
+        self._rope = None
+
+    def _tree(self) -> Rope:
+        if self._flat is not None:
+            self._check()
+        if self._rope is None:
+            self._rope = Rope.from_sequence(self._flat or [])
+        return self._rope
+
+    def _invalidate(self) -> None:
+        super()._invalidate()
+        if self._flat is None:
+            self._flat = list(self._rope or EMPTY)
+        self._rope = None
+
+    def _set_tree(self, rope: Rope) -> Self:
+        super()._invalidate()
+        self._rope = rope
+        self._flat = None
+        self._shared = False
+        return self
+
+    def _coerce(self, content: MessageChain | Sequence[str | Element] | Element | str) -> Rope:
+        if isinstance(content, RopeMessageChain):
+            return content._tree()
+        if isinstance(content, MessageChain):
+            return Rope.from_sequence(content._content)
+        if isinstance(content, str):
+            return Rope(items=(self._text_class(content),))
+        if isinstance(content, Element):
+            return Rope(items=(content,))
+        return Rope.from_sequence([self._text_class(e) if isinstance(e, str) else e for e in content])
+
+    def materialize(self) -> MessageChain:
+        """展开为普通的消息链."""
+        return MessageChain._build(self._content.copy())
+
+    def copy(self) -> Self:
+        if self._flat is not None:
+            return super().copy()
+        return self._build_tree(self._tree())
+
+    @classmethod
+    def _build_tree(cls, rope: Rope) -> Self:
+        chain = object.__new__(cls)
+        chain._rope = rope
+        return chain
+
+    def __len__(self) -> int:
+        return len(self._flat) if self._flat is not None else self._tree().length
+
+    @overload
+    def __getitem__(self, item: type[Element]) -> list[Any]: ...
+
+    @overload
+    def __getitem__(self, item: int) -> Element: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> Self: ...
+
+    def __getitem__(self, item: type[Element] | int | slice) -> Any:
+        if self._flat is None:
+            if isinstance(item, int):
+                return self._tree()[item]
+            if isinstance(item, slice) and item.step in (None, 1):
+                start, stop, _ = item.indices(len(self))
+                return self._build_tree(self._tree().slice(start, stop))
+        return super().__getitem__(item)
+
+    def append(self, element: Element | str, copy: bool = False) -> Self:
+        chain_ref = self.copy() if copy else self
+        return chain_ref._set_tree(join(chain_ref._tree(), self._coerce(element)))
+
+    def extend(self, *content: Self | Element | list[Element | str], copy: bool = False) -> Self:
+        rope = self._tree()
+        for i in content:
+            rope = join(rope, self._coerce(i))
+        if copy:
+            return self._build_tree(rope)
+        return self._set_tree(rope)
+
+    def __add__(self, content: MessageChain | list[Element] | Element | str) -> Self:
+        return self._build_tree(join(self._tree(), self._coerce(content)))
+
+    def __radd__(self, content: MessageChain | list[Element] | Element | str) -> Self:
+        return self._build_tree(join(self._coerce(content), self._tree()))
+
+    def __iadd__(self, content: MessageChain | list[Element] | Element | str) -> Self:
+        return self._set_tree(join(self._tree(), self._coerce(content)))
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any, overload
+from typing_extensions import Self
+
+from .chain import MessageChain
+from .element import _MUTATIONS, Element, Text
+
+
+class ChainView(MessageChain):
+    """消息链的只读视图, 引用原消息链的元素存储, 只记录起止元素下标与两端 Text 元素内的字符偏移.
+
+    `len`, 按下标取值, 迭代, `str`, `startswith`, `endswith` 与真值判断直接在原存储上进行;
+    切片, `removeprefix`, `removesuffix` 与 `strip` 系列方法返回范围更窄的新视图, 不会复制元素.
+    其余的方法会先将视图展开为元素列表, 此后与普通的消息链无异.
+
+    原消息链在视图创建后被修改时会先复制其元素列表 (写时复制), 因此视图的内容不会改变.
+    """
+
+    _base: list[Element] | None = None
+    _start: int = 0
+    _stop: int = 0
+    _head: int = 0  # 第一个 Text 元素内的起始偏移
+    _tail: int | None = None  # 最后一个 Text 元素内的结束偏移, None 表示到末尾
+    _elements: list[Element]
+    _parent_class: type[MessageChain] = MessageChain
+
+    def __init__(self, parent: MessageChain, start: int | None = None, stop: int | None = None):
+        """创建消息链的视图.
+
+        Args:
+            parent (MessageChain): 原消息链.
+            start (int, optional): 起始元素下标, 与切片相同.
+            stop (int, optional): 结束元素下标, 与切片相同.
+        """
+        start, stop, _ = slice(start, stop).indices(len(parent))
+        stop = max(start, stop)
+        if isinstance(parent, ChainView) and parent._base is not None:
+            self._parent_class = parent._parent_class
+            self._reset(
+                parent._base,
+                parent._start + start,
+                parent._start + stop,
+                parent._head if start == 0 else 0,
+                parent._tail if stop == len(parent) else None,
+            )
+        else:
+            self._parent_class = parent._parent_class if isinstance(parent, ChainView) else parent.__class__
+            self._reset(parent._lend()[0], start, stop, 0, None)
+
+    def _reset(self, base: list[Element], start: int, stop: int, head: int, tail: int | None) -> Self:
+        if start >= stop:
+            start, stop, head, tail = start, start, 0, None
+        self._base, self._start, self._stop, self._head, self._tail = base, start, stop, head, tail
+        return self
+
+    def _window(self, start: int, stop: int, head: int = 0, tail: int | None = None, copy: bool = True) -> Self:
+        base: Any = self._base
+        if not copy:
+            super()._invalidate()
+            return self._reset(base, start, stop, head, tail)
+        view = object.__new__(self.__class__)
+        view._parent_class = self._parent_class
+        return view._reset(base, start, stop, head, tail)
+
+    def _derive(self, content: list[Element], shared: bool = False) -> Self:
+        chain = super()._derive(content, shared)
+        chain._parent_class = self._parent_class
+        return chain
+
+    @property
+    def _content(self) -> list[Element]:
+        if self._base is not None:
+            self._elements = self._slice()
+            self._base = None
+        return self._elements
+
+    @_content.setter
+    def _content(self, value: list[Element]) -> None:
+        self._base = None
+        self._elements = value
+
+    def _bounds(self, index: int) -> tuple[int, int]:
+        """获取原存储中第 index 个 Text 元素在视图内可见的字符范围."""
+        text: str = self._base[index].text  # type: ignore
+        head = self._head if index == self._start else 0
+        tail = self._tail if index == self._stop - 1 and self._tail is not None else len(text)
+        return head, tail
+
+    def _element(self, index: int) -> Element:
+        elem = self._base[index]  # type: ignore
+        if isinstance(elem, Text):
+            head, tail = self._bounds(index)
+            if head or tail != len(elem.text):
+                return elem._with_text(elem.text[head:tail])
+        return elem
+
+    def _slice(self) -> list[Element]:
+        content = self._base[self._start : self._stop]  # type: ignore
+        if content:
+            content[0] = self._element(self._start)
+            content[-1] = self._element(self._stop - 1)
+        return content
+
+    @property
+    def is_view(self) -> bool:
+        """是否仍为视图, 即尚未展开为元素列表."""
+        return self._base is not None
+
+    def materialize(self) -> MessageChain:
+        """展开为与原消息链相同类型的普通消息链."""
+        if self._base is None:
+            return self._parent_class._build(*self._lend())
+        return self._parent_class._build(self._slice())
+
+    def copy(self) -> Self:
+        if self._base is None:
+            return super().copy()
+        return self._window(self._start, self._stop, self._head, self._tail)
+
+    def __len__(self) -> int:
+        if self._base is None:
+            return len(self._elements)
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[Element]:
+        if self._base is None:
+            yield from self._elements
+            return
+        for index in range(self._start, self._stop):
+            yield self._element(index)
+
+    @overload
+    def __getitem__(self, item: type[Element]) -> list[Any]: ...
+
+    @overload
+    def __getitem__(self, item: int) -> Element: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> Self: ...
+
+    def __getitem__(self, item: type[Element] | int | slice) -> Any:
+        if self._base is not None:
+            if isinstance(item, int):
+                if item < 0:
+                    item += len(self)
+                if not 0 <= item < len(self):
+                    raise IndexError("chain index out of range")
+                return self._element(self._start + item)
+            if isinstance(item, slice) and item.step in (None, 1):
+                start, stop, _ = item.indices(len(self))
+                stop = max(start, stop)
+                return self._window(
+                    self._start + start,
+                    self._start + stop,
+                    self._head if start == 0 else 0,
+                    self._tail if stop == len(self) else None,
+                )
+        return super().__getitem__(item)
+
+    def __str__(self) -> str:
+        if self._base is None:
+            return super().__str__()
+        if self._text_cache is not None and self._mutations == _MUTATIONS[0]:
+            return self._text_cache
+        base = self._base
+        parts: list[str] = []
+        trackable = True
+        for index in range(self._start, self._stop):
+            elem = base[index]
+            trackable = trackable and (elem._immutable or elem._tracked)
+            if isinstance(elem, Text):
+                head, tail = self._bounds(index)
+                parts.append(elem.text[head:tail])
+            else:
+                parts.append(str(elem))
+        text = "".join(parts)
+        if trackable:
+            self._text_cache = text
+            self._mutations = _MUTATIONS[0]
+        return text
+
+    def __bool__(self) -> bool:
+        if self._base is None:
+            return super().__bool__()
+        return bool(str(self))
+
+    def startswith(self, string: str) -> bool:
+        if self._base is None:
+            return super().startswith(string)
+        if self._start == self._stop or not isinstance(elem := self._base[self._start], Text):
+            return False
+        return elem.text.startswith(string, *self._bounds(self._start))
+
+    def endswith(self, string: str) -> bool:
+        if self._base is None:
+            return super().endswith(string)
+        if self._start == self._stop or not isinstance(elem := self._base[self._stop - 1], Text):
+            return False
+        return elem.text.endswith(string, *self._bounds(self._stop - 1))
+
+    def removeprefix(self, prefix: str, *, copy: bool = True) -> Self:
+        if self._base is None:
+            return super().removeprefix(prefix, copy=copy)
+        if not self.startswith(prefix):
+            return self.copy() if copy else self
+        head, tail = self._bounds(self._start)
+        if head + len(prefix) < tail:
+            return self._window(self._start, self._stop, head + len(prefix), self._tail, copy)
+        return self._window(self._start + 1, self._stop, 0, self._tail, copy)
+
+    def removesuffix(self, suffix: str, *, copy: bool = True) -> Self:
+        if self._base is None:
+            return super().removesuffix(suffix, copy=copy)
+        if not self.endswith(suffix):
+            return self.copy() if copy else self
+        head, tail = self._bounds(self._stop - 1)
+        if tail - len(suffix) > head:
+            return self._window(self._start, self._stop, self._head, tail - len(suffix), copy)
+        return self._window(self._start, self._stop - 1, self._head, None, copy)
+
+    def lstrip(self, *elements: str | type[Element] | Element, copy: bool = True) -> Self:
+        if self._base is None:
+            return super().lstrip(*elements, copy=copy)
+        types = [i for i in elements if not isinstance(i, str)]
+        chars = "".join([i for i in elements if isinstance(i, str)]) or None
+        index, head = self._start, self._head
+        while index < self._stop:
+            elem = self._base[index]
+            if elem in types or elem.__class__ in types:
+                index, head = index + 1, 0
+            elif isinstance(elem, Text):
+                start, end = self._bounds(index)
+                text = elem.text[start:end].lstrip(chars)
+                if not text:
+                    index, head = index + 1, 0
+                    continue
+                head = end - len(text)
+                break
+            else:
+                break
+        if index == self._start and head == self._head:
+            return self.copy() if copy else self
+        return self._window(index, self._stop, head, self._tail, copy)
+
+    def rstrip(self, *elements: str | type[Element] | Element, copy: bool = True) -> Self:
+        if self._base is None:
+            return super().rstrip(*elements, copy=copy)
+        types = [i for i in elements if not isinstance(i, str)]
+        chars = "".join([i for i in elements if isinstance(i, str)]) or None
+        index, tail = self._stop, self._tail
+        while index > self._start:
+            elem = self._base[index - 1]
+            if elem in types or elem.__class__ in types:
+                index, tail = index - 1, None
+            elif isinstance(elem, Text):
+                start, end = self._bounds(index - 1)
+                text = elem.text[start:end].rstrip(chars)
+                if not text:
+                    index, tail = index - 1, None
+                    continue
+                tail = start + len(text)
+                break
+            else:
+                break
+        if index == self._stop and tail == self._tail:
+            return self.copy() if copy else self
+        return self._window(self._start, index, self._head, tail, copy)
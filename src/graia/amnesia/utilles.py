@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-import random
+import os
 import string
-from collections.abc import Callable, Hashable
-from typing import TypeVar, Union
+import sys
+import threading
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
+from types import MappingProxyType
+from typing import Any, Generic, TypeVar, Union
+from weakref import WeakSet
 
 T = TypeVar("T")
 H = TypeVar("H", bound=Hashable)
@@ -68,10 +73,261 @@ def priority_strategy(
     return result
 
 
-T = TypeVar("T")
+class PriorityResolver(Generic[T, H]):
+    """`priority_strategy` 的增量版本, 适合在长期存在的物品集合上反复解析.
+
+    每次 `add` 或 `remove` 只会重新解析受影响的键, 冲突检查与 `priority_strategy` 相同,
+    且发生冲突时不会修改任何状态. 解析结果通过 `mapping` 以只读快照的形式提供.
+    """
+
+    getter: Callable[[T], PriorityType[H]]
+
+    def __init__(self, getter: Callable[[T], PriorityType[H]], items: Iterable[T] = ()) -> None:
+        """
+        Args:
+            getter (Callable[[T], PriorityType[H]]): 与 `priority_strategy` 相同, 获取物品的模式.
+            items (Iterable[T]): 初始的物品.
+        """
+        self.getter = getter
+        self._result: dict[H, T] = {}
+        self._cache: dict[H, Any] = {}
+        self._contenders: dict[H, list[tuple[Any, int, T]]] = {}
+        self._entries: dict[int, tuple[T, list[H]]] = {}
+        self._counter = 0
+        self._snapshot: MappingProxyType[H, T] | None = None
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def _flatten(pattern: PriorityType[H]) -> Iterator[tuple[H, Any, bool]]:
+        if isinstance(pattern, (dict, set)):
+            patterns = (pattern,)
+        elif isinstance(pattern, tuple):
+            patterns = pattern
+        else:
+            raise TypeError(f"{pattern} is not a valid pattern.")
+        for subpattern in patterns:
+            if isinstance(subpattern, set):
+                for content in subpattern:
+                    yield content, ..., True
+            elif isinstance(subpattern, dict):
+                for content, priority in subpattern.items():
+                    yield content, priority, False
+            else:
+                raise TypeError(f"{subpattern} is not a valid pattern.")
+
+    def add(self, item: T) -> None:
+        """添加物品, 若与已有的物品冲突则抛出 ValueError, 且不做任何修改."""
+        if id(item) in self._entries:
+            raise ValueError(f"{item} is already added.")
+        pairs = list(self._flatten(self.getter(item)))
+        staged: dict[H, tuple[Any, T]] = {}
+        for content, priority, unlocated in pairs:
+            if content in staged:
+                current = staged[content]
+            elif content in self._cache:
+                current = (self._cache[content], self._result[content])
+            else:
+                staged[content] = (priority, item)
+                continue
+            if unlocated:
+                raise ValueError(
+                    f"{content} which is an unlocated item is already existed, and it conflicts with {current[1]}"
+                )
+            if current[0] is ...:
+                raise ValueError(
+                    f"{content} is already existed, and it conflicts with {current[1]}, an unlocated item."
+                )
+            if priority is ...:
+                raise ValueError(
+                    f"{content} which is an unlocated item is already existed, and it conflicts with {current[1]}"
+                )
+            if current[0] < priority:
+                staged[content] = (priority, item)
+        seq = self._counter
+        self._counter += 1
+        for content, priority, _ in pairs:
+            self._contenders.setdefault(content, []).append((priority, seq, item))
+        for content, (priority, winner) in staged.items():
+            self._cache[content] = priority
+            self._result[content] = winner
+        self._entries[id(item)] = (item, [content for content, _, _ in pairs])
+        self._snapshot = None
+
+    def remove(self, item: T) -> None:
+        """移除物品, 并重新解析其涉及的键."""
+        entry = self._entries.pop(id(item), None)
+        if entry is None:
+            raise KeyError(item)
+        for content in dict.fromkeys(entry[1]):
+            contenders = [c for c in self._contenders[content] if c[2] is not item]
+            if not contenders:
+                del self._contenders[content], self._cache[content], self._result[content]
+                continue
+            self._contenders[content] = contenders
+            best = contenders[0]
+            for contender in contenders[1:]:
+                if best[0] < contender[0]:
+                    best = contender
+            self._cache[content] = best[0]
+            self._result[content] = best[2]
+        self._snapshot = None
+
+    @property
+    def mapping(self) -> MappingProxyType[H, T]:
+        """当前解析结果的只读快照, 在下一次修改前会被复用."""
+        if self._snapshot is None:
+            self._snapshot = MappingProxyType(dict(self._result))
+        return self._snapshot
+
+    def __getitem__(self, key: H) -> T:
+        return self._result[key]
+
+    def get(self, key: H, default: Any = None) -> Any:
+        return self._result.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._result
+
+    def __len__(self) -> int:
+        return len(self._result)
 
 
 class Registrar(dict):
+    """可分层查找的注册表.
+
+    自身的条目优先, 找不到时依次在 `parents` 中查找, 父级不会被复制, 其后续的修改也会立即可见.
+    查找, `len`, 迭代, `keys`/`values`/`items`, `copy`, `repr`, 比较与 `|` 都作用于合并后的全部层级,
+    `dict(registrar)` 也会得到全部条目. 只有直接读取底层存储的 C 实现 (如自身没有条目时的 `json.dumps`)
+    看不到父级的条目, 此时应使用 `flatten`.
+    """
+
+    _parents: tuple[Mapping, ...] = ()
+    _frozen: MappingProxyType | None = None
+
+    def __init__(self, *args, parents: Iterable[Mapping] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self._parents = tuple(parents)
+
+    def __missing__(self, key):
+        if self._frozen is not None:
+            return self._frozen[key]
+        for parent in self._parents:
+            try:
+                return parent[key]
+            except KeyError:
+                pass
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        if self._frozen is not None:
+            return key in self._frozen
+        for parent in self._parents:
+            if key in parent:
+                return True
+        return False
+
+    def flatten(self) -> dict:
+        """合并所有层级, 得到普通的字典; 自身的条目覆盖父级的条目. 冻结后返回冻结时的内容."""
+        if self._frozen is not None:
+            return dict(self._frozen)
+        result = {}
+        for parent in reversed(self._parents):
+            result.update(parent.flatten() if isinstance(parent, Registrar) else parent)
+        result.update(dict.items(self))
+        return result
+
+    def __iter__(self):
+        return iter(self.flatten()) if self._parents else dict.__iter__(self)
+
+    def __len__(self) -> int:
+        return len(self.flatten()) if self._parents else dict.__len__(self)
+
+    def keys(self):
+        return self.flatten().keys() if self._parents else dict.keys(self)
+
+    def values(self):
+        return self.flatten().values() if self._parents else dict.values(self)
+
+    def items(self):
+        return self.flatten().items() if self._parents else dict.items(self)
+
+    def __reversed__(self):
+        return reversed(self.flatten()) if self._parents else dict.__reversed__(self)
+
+    def copy(self) -> dict:
+        return self.flatten()
+
+    def __repr__(self) -> str:
+        return repr(self.flatten()) if self._parents else dict.__repr__(self)
+
+    def __eq__(self, other):
+        if isinstance(other, Registrar):
+            other = other.flatten()
+        elif not isinstance(other, dict):
+            return NotImplemented
+        return self.flatten() == other if self._parents else dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None  # type: ignore
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.flatten() | dict(other)
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(other) | self.flatten()
+
+    def _check_frozen(self) -> None:
+        if self._frozen is not None:
+            raise RuntimeError(f"{self.__class__.__name__} is frozen")
+
+    def __setitem__(self, key, value) -> None:
+        self._check_frozen()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key) -> None:
+        self._check_frozen()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._check_frozen()
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs) -> None:
+        self._check_frozen()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._check_frozen()
+        return super().setdefault(key, default)
+
+    def pop(self, key, *args):
+        self._check_frozen()
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self._check_frozen()
+        return super().popitem()
+
+    def clear(self) -> None:
+        self._check_frozen()
+        super().clear()
+
     def register(self, key):
         def decorator(method):
             self[key] = method
@@ -80,12 +336,121 @@ class Registrar(dict):
         return decorator
 
     def decorate(self, attr):
+        """将自身叠加到类的 `attr` 属性之上, 而不是将全部条目复制进去."""
+
         def decorator(cls: type[T]) -> type[T]:
-            getattr(cls, attr).update(self)
+            setattr(cls, attr, Registrar(parents=(self, getattr(cls, attr))))
             return cls
 
         return decorator
 
+    def freeze(self) -> MappingProxyType:
+        """合并所有层级并冻结, 返回只读的查找表.
+
+        此后所有修改自身的操作都会抛出 `RuntimeError`, 查找也只使用冻结时的内容, 不再反映父级之后的修改.
+        """
+        if self._frozen is None:
+            self._frozen = MappingProxyType(self.flatten())
+        return self._frozen
+
+    def _lookup(self) -> Callable[[Any], Any]:
+        """获取最快的查找函数, 用于热路径上的批量查找."""
+        if self._frozen is not None:
+            return self._frozen.get
+        if not self._parents:
+            return dict.get.__get__(self)
+        return self.get
+
+    def memory_saved(self) -> int:
+        """估算与将所有层级复制进自身相比节省的内存 (字节)."""
+        if not self._parents:
+            return 0
+        return sys.getsizeof(self.flatten()) - sys.getsizeof(dict(dict.items(self)))
+
+
+_ALPHABET = (string.ascii_letters + string.digits).encode()
+# 248 = 62 * 4, 将 0~247 的字节均匀映射到字母表上, 丢弃 248~255 以避免偏差
+_ID_TABLE = bytes.maketrans(bytes(range(248)), _ALPHABET * 4)
+_ID_DISCARD = bytes(range(248, 256))
+_generators: WeakSet[IdGenerator] = WeakSet()
+
+
+class IdGenerator:
+    """批量生成随机 ID 的生成器.
+
+    一次从 `os.urandom` 读取大量随机字节, 通过查找表转换为字母与数字后缓存起来, 每次生成只需切片.
+    可以选择记录最近生成的 ID, 并在重复时重新生成. 线程安全, 且在 fork 后子进程会丢弃已缓存的随机数据.
+    """
+
+    def __init__(self, length: int = 12, *, bulk: int = 4096, history: int = 0) -> None:
+        """
+        Args:
+            length (int): 默认的 ID 长度.
+            bulk (int): 每次从 `os.urandom` 读取的字节数.
+            history (int): 用于检查重复的最近 ID 的数量, 为 0 时不检查.
+                必须小于该长度的 ID 的总数 (62 ** length), 否则可能无法生成不重复的 ID.
+        """
+        self._min_length = 0
+        while len(_ALPHABET) ** self._min_length <= history:
+            self._min_length += 1
+        if length < self._min_length:
+            raise ValueError(f"history {history} is not smaller than the number of ids of length {length}")
+        self.length = length
+        self.bulk = bulk
+        self.history = history
+        self._buffer = ""
+        self._pos = 0
+        self._recent: set[str] = set()
+        self._order: deque[str] = deque()
+        self._lock = threading.Lock()
+        _generators.add(self)
+
+    def _reset(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+
+    def _take(self, length: int) -> str:
+        end = self._pos + length
+        while end > len(self._buffer):
+            chunk = os.urandom(max(self.bulk, length * 2)).translate(_ID_TABLE, _ID_DISCARD).decode()
+            self._buffer = self._buffer[self._pos :] + chunk
+            self._pos, end = 0, length
+        result = self._buffer[self._pos : end]
+        self._pos = end
+        return result
+
+    def __call__(self, length: int | None = None) -> str:
+        """生成一个 ID.
+
+        Args:
+            length (int, optional): ID 的长度, 默认为创建时指定的长度.
+        """
+        length = self.length if length is None else length
+        if length < self._min_length:
+            raise ValueError(f"history {self.history} is not smaller than the number of ids of length {length}")
+        with self._lock:
+            result = self._take(length)
+            if self.history:
+                recent = self._recent
+                while result in recent:
+                    result = self._take(length)
+                recent.add(result)
+                self._order.append(result)
+                if len(self._order) > self.history:
+                    recent.discard(self._order.popleft())
+            return result
+
+
+def _reset_generators() -> None:
+    for generator in _generators:
+        generator._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_generators)
+
+_default_generator = IdGenerator()
+
 
 def random_id(length=12):
-    return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+    return _default_generator(length)
@@ -0,0 +1,78 @@
+"""`ChainCodec` 与 pickle, JSON 的体积及编解码速度对比.
+
+运行: python tests/benchmarks/bench_codec.py
+"""
+
+from __future__ import annotations
+
+import json
+import pickle
+import random
+import timeit
+
+from graia.amnesia.message import ChainCodec, MessageChain
+from graia.amnesia.message.element import FrozenText, Text, Unknown
+
+
+def to_json(chains: list[MessageChain]) -> str:
+    return json.dumps(
+        [
+            [
+                {"type": "text", "text": e.text, "style": e.style} if isinstance(e, Text) else {"type": e.type, "raw": e.raw_data}  # type: ignore
+                for e in chain
+            ]
+            for chain in chains
+        ]
+    )
+
+
+def from_json(data: str) -> list[MessageChain]:
+    return [
+        MessageChain(
+            [Text(e["text"], e["style"]) if e["type"] == "text" else Unknown(e["type"], e["raw"]) for e in chain]
+        )
+        for chain in json.loads(data)
+    ]
+
+
+def best(func, number: int = 3) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    random.seed(0)
+    codec = ChainCodec()
+    chains = [
+        MessageChain(
+            [
+                Text("hello world " * random.randint(1, 5)),
+                Unknown("at", {"id": i, "name": "user"}),
+                Text("x", "bold"),
+                FrozenText("y"),
+            ]
+        )
+        for i in range(10000)
+    ]
+    data = codec.encode_many(chains)
+    pickled = pickle.dumps(chains, protocol=pickle.HIGHEST_PROTOCOL)
+    dumped = to_json(chains)
+    assert codec.decode_many(memoryview(data)) == chains
+    assert pickle.loads(pickled) == chains
+
+    print(f"size of {len(chains)} chains: codec {len(data)} B  pickle {len(pickled)} B  json {len(dumped)} B")
+    encode = {
+        "codec": lambda: codec.encode_many(chains),
+        "pickle": lambda: pickle.dumps(chains, protocol=pickle.HIGHEST_PROTOCOL),
+        "json": lambda: to_json(chains),
+    }
+    decode = {
+        "codec": lambda: codec.decode_many(memoryview(data)),
+        "pickle": lambda: pickle.loads(pickled),
+        "json": lambda: from_json(dumped),
+    }
+    for name, funcs in (("encode", encode), ("decode", decode)):
+        print(f"{name}: " + "  ".join(f"{key} {best(func) * 1e3:7.2f} ms" for key, func in funcs.items()))
+
+
+if __name__ == "__main__":
+    main()
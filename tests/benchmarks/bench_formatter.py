@@ -0,0 +1,66 @@
+"""`Formatter.format` 与每次调用都重新 `str.format` 并以正则拆分的旧实现的对比.
+
+运行: python tests/benchmarks/bench_formatter.py
+"""
+
+from __future__ import annotations
+
+import re
+import timeit
+
+from graia.amnesia.message import Formatter, MessageChain
+from graia.amnesia.message.element import Element, Text, Unknown
+
+
+def extract(obj: Element | MessageChain | str) -> list[Element]:
+    if isinstance(obj, MessageChain):
+        return obj.content
+    if isinstance(obj, str):
+        return [Text(obj)]
+    return [obj]
+
+
+def legacy_format(format_string: str, *o_args: Element | MessageChain | str, **o_kwargs: Element | MessageChain | str):
+    """旧实现: 以哨兵字符串调用 `str.format`, 再以未编译的正则拆分, 最后合并一次."""
+    args = [extract(e) for e in o_args]
+    kwargs = {k: extract(e) for k, e in o_kwargs.items()}
+    args_mapping = {f"\x02{index}\x02": chain for index, chain in enumerate(args)}
+    kwargs_mapping = {f"\x03{key}\x03": chain for key, chain in kwargs.items()}
+    result = format_string.format(*args_mapping, **{k: f"\x03{k}\x03" for k in kwargs})
+    chain_list: list[Element] = []
+    for i in re.split("([\x02\x03][\\d\\w]+[\x02\x03])", result):
+        if match := re.fullmatch("(?P<header>[\x02\x03])(?P<content>\\w+)(?P=header)", i):
+            if match["header"] == "\x02":
+                chain_list.extend(args_mapping[match[0]])
+            else:
+                chain_list.extend(kwargs_mapping[match[0]])
+        else:
+            chain_list.append(Text(i))
+    return MessageChain(chain_list).merge()
+
+
+def best(func, number: int = 20000) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    at = Unknown("at", {"id": 1})
+    cases = {
+        "positional": ("Hello {0}, welcome to {1}!", (at, "group"), {}),
+        "keyword": (
+            "{user} used {item} on {target} x{count}",
+            (),
+            {"user": at, "item": "potion", "target": at, "count": "3"},
+        ),
+        "chain": ("[{}] {}", ("INFO", MessageChain(["text ", at, " tail"])), {}),
+    }
+    for name, (template, args, kwargs) in cases.items():
+        formatter = Formatter(template)
+        assert formatter.format(*args, **kwargs) == legacy_format(template, *args, **kwargs)
+        new = best(lambda: formatter.format(*args, **kwargs))
+        old = best(lambda: legacy_format(template, *args, **kwargs))
+        print(f"{name:<10}: legacy {old * 1e6:7.2f} us  Formatter {new * 1e6:7.2f} us  x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""`MessageChain.index_sub` 与逐字符展开后进行 KMP 匹配的旧实现的对比.
+
+运行: python tests/benchmarks/bench_index_sub.py
+"""
+
+from __future__ import annotations
+
+import random
+import timeit
+from collections.abc import Sequence
+
+from graia.amnesia.message import MessageChain
+from graia.amnesia.message.element import Element, Text, Unknown
+
+
+def kmp_index_sub(content: Sequence[str | Element], sub: Sequence[str | Element]) -> list[int]:
+    """旧实现: 将双方展开为每个字符一项的列表, 再进行 KMP 匹配."""
+
+    def unzip(seq: Sequence[str | Element]) -> list[str | Element]:
+        res: list[str | Element] = []
+        for e in seq:
+            if isinstance(e, Text):
+                res.extend(e.text)
+            elif isinstance(e, str):
+                res.extend(e)
+            else:
+                res.append(e)
+        return res
+
+    pattern = unzip(sub)
+    target = unzip(content)
+    if len(target) < len(pattern):
+        return []
+    fallback = [0 for _ in pattern]
+    current = 0
+    for i in range(1, len(pattern)):
+        while current and pattern[i] != pattern[current]:
+            current = fallback[current - 1]
+        if pattern[i] == pattern[current]:
+            current += 1
+        fallback[i] = current
+    result: list[int] = []
+    ptr = 0
+    for i, e in enumerate(target):
+        while ptr and e != pattern[ptr]:
+            ptr = fallback[ptr - 1]
+        if e == pattern[ptr]:
+            ptr += 1
+        if ptr == len(pattern):
+            result.append(i - ptr + 1)
+            ptr = fallback[ptr - 1]
+    return result
+
+
+def make_chain(size: int, elements: int) -> list[str | Element]:
+    parts: list[str | Element] = []
+    for i in range(elements):
+        parts.append("".join(random.choices("abcdefgh ", k=size // elements)))
+        parts.append(Unknown("at", {"id": i}))
+    return parts
+
+
+def best(func, number: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    random.seed(1)
+    patterns = {"text": ["abcab"], "element": ["ab", Unknown("at", {"id": 3}), "cd"]}
+    for size in (1_000, 10_000, 100_000):
+        parts = make_chain(size, 10)
+        chain = MessageChain(parts)
+        for name, pattern in patterns.items():
+            assert chain.index_sub(pattern) == kmp_index_sub(chain.content, pattern)
+            new = best(lambda: MessageChain(parts).index_sub(pattern))
+            old = best(lambda: kmp_index_sub(chain.content, pattern))
+            print(
+                f"{size:>7} chars, {name:<7} pattern: kmp {old * 1e3:8.3f} ms  index_sub {new * 1e3:8.3f} ms  x{old / new:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
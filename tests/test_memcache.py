@@ -0,0 +1,178 @@
+import asyncio
+from datetime import timedelta
+from time import time
+from typing import Any
+
+import pytest
+from launart import Launart
+
+from graia.amnesia.builtins import memcache
+from graia.amnesia.builtins.memcache import Memcache, MemcacheService
+
+
+def test_bounded_memcache():
+    async def main():
+        lru = Memcache({}, [], max_entries=2)
+        await lru.set("a", 1)
+        await lru.set("b", 2)
+        assert await lru.get("a") == 1
+        await lru.set("c", 3)
+        assert await lru.keys() == ["a", "c"]
+        assert (lru.stats.hits, lru.stats.evictions) == (1, 1)
+
+        lfu = Memcache({}, [], max_entries=2, policy="lfu")
+        await lfu.set("a", 1)
+        await lfu.set("b", 2)
+        await lfu.get("b")
+        await lfu.set("c", 3)
+        assert sorted(await lfu.keys()) == ["b", "c"]
+
+        tiny = Memcache({}, [], max_entries=1, policy="tinylfu")
+        await tiny.set("a", 1)
+        await tiny.get("a")
+        await tiny.set("b", 2)
+        assert await tiny.keys() == ["a"] and tiny.stats.rejections == 1
+        sketch: Any = Memcache({}, [], max_entries=1 << 18, policy="tinylfu")._policy
+        rows = zip(*(sketch._slots(str(i)) for i in range(100_000)))
+        # 每行应当用满整个宽度: 10 万个键落入 2 ** 18 个计数器, 期望占用约 8.3 万个
+        assert all(len({slot - row * sketch.width for slot in slots}) > 80_000 for row, slots in enumerate(rows))
+
+        sized = Memcache({}, [], max_bytes=100, sizeof=lambda key, value: len(value))
+        await sized.set("a", "x" * 60)
+        await sized.set("b", "x" * 60)
+        assert await sized.keys() == ["b"] and sized.size == 60
+
+    asyncio.run(main())
+
+
+def test_memcache_expiry_heap():
+    async def main():
+        cache = Memcache({}, [])
+        await cache.set("a", 1, timedelta(seconds=-1))
+        await cache.set("a", 2, timedelta(seconds=60))
+        assert cache.sweep() == 0 and await cache.get("a") == 2
+
+        for _ in range(1000):
+            await cache.set("hot", 0, timedelta(seconds=60))
+        assert len(cache.expire) <= 2 * len(cache.cache) + 64
+        assert cache.next_deadline() is not None
+        assert cache.sweep(time() + 120, limit=1) == 1
+        assert cache.sweep(time() + 120) == 1 and not cache.cache
+
+    asyncio.run(main())
+
+
+def test_memcache_batch_and_atomic():
+    async def main():
+        cache = Memcache({}, [])
+        cache.set_nowait("a", 1)
+        assert cache.get_nowait("a") == 1 and cache.get_nowait("b", 0) == 0
+        await cache.set_many({"b": 2, "c": 3}, timedelta(seconds=60))
+        assert await cache.get_many(["a", "b", "x"]) == [1, 2, None]
+        await cache.delete_many(["a", "x"])
+        assert sorted(await cache.keys()) == ["b", "c"]
+
+        assert await cache.incr("n", expire=timedelta(seconds=60)) == 1
+        assert await cache.incr("n", 5) == 6 and await cache.decr("n", 2) == 4
+        assert cache.cache["n"][0] is not None
+        assert await cache.setdefault("n", 0) == 4 and await cache.setdefault("m", 0) == 0
+        assert await cache.getset("m", 1) == 0 and cache.get_nowait("m") == 1
+
+        tiny = Memcache({}, [], max_entries=2, policy="tinylfu")
+        for _ in range(5):
+            await tiny.set("a", 1)
+            await tiny.set("b", 2)
+            await tiny.get("a")
+            await tiny.get("b")
+        assert [await tiny.incr("rate") for _ in range(3)] == [1, 2, 3]
+        assert await tiny.setdefault("x", 0) == 0 and await tiny.getset("y", 1) is None
+        assert tiny.get_nowait("y") == 1 and len(tiny.cache) == 2
+
+    asyncio.run(main())
+
+
+def test_memcache_get_or_set():
+    async def main():
+        cache = Memcache({}, [])
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        expire, stale = timedelta(seconds=0.02), timedelta(seconds=10)
+        results = await asyncio.gather(
+            *[cache.get_or_set("k", factory, expire, stale_while_revalidate=stale) for _ in range(50)]
+        )
+        assert results == [1] * 50 and calls == 1
+
+        await asyncio.sleep(0.03)
+        assert await cache.get_or_set("k", factory, expire, stale_while_revalidate=stale) == 1
+        await asyncio.sleep(0.05)
+        assert calls == 2 and await cache.get("k") == 2
+
+        async def fail():
+            raise RuntimeError
+
+        results = await asyncio.gather(*[cache.get_or_set("e", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results) and not await cache.has("e")
+
+    asyncio.run(main())
+
+
+def test_memcache_service_sweeper(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr(memcache, "time", lambda: now)
+
+    async def main():
+        nonlocal now
+        manager = Launart()
+        service = MemcacheService()
+        manager.add_component(service)
+        cache = service.cache
+        swept: list[list[str]] = []
+        sweep = cache.sweep
+
+        def recorded(*args, **kwargs):
+            before = list(cache.cache)
+            result = sweep(*args, **kwargs)
+            swept.append([key for key in before if key not in cache.cache])
+            return result
+
+        async def settle():
+            # 只让出事件循环, 不依赖真实时间: 计时都远在假时钟之外, 只有 wakeup 能唤醒清理任务
+            for _ in range(20):
+                await asyncio.sleep(0)
+
+        cache.sweep = recorded  # type: ignore
+        task = asyncio.create_task(manager.launch())
+        while cache.wakeup is None:
+            await asyncio.sleep(0.01)
+        await settle()
+        assert swept == [[]]
+
+        await cache.set("far", 1, timedelta(seconds=1000))
+        await cache.set("near", 1, timedelta(seconds=500))
+        await settle()
+        idle = len(swept)
+        assert await cache.has("near") and await cache.has("far")
+
+        now += 600
+        assert cache.wakeup is not None
+        cache.wakeup.set()
+        await settle()
+        assert swept[idle:] == [["near"]] and await cache.has("far")
+        await settle()
+        assert len(swept) == idle + 1
+
+        now += 600
+        cache.wakeup.set()
+        await settle()
+        assert [keys for keys in swept if keys] == [["near"], ["far"]] and not cache.cache
+
+        manager.status.exiting = True
+        await asyncio.wait_for(task, 5)
+
+    asyncio.run(main())
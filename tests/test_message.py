@@ -1,5 +1,20 @@
-from graia.amnesia.message import MessageChain
-from graia.amnesia.message.element import Text, Unknown
+import pickle
+import re
+
+import pytest
+
+from graia.amnesia.message import (
+    ChainBatch,
+    ChainCodec,
+    ChainMatcher,
+    ChainView,
+    ElementRegistry,
+    Formatter,
+    LazyMessageChain,
+    MessageChain,
+    RopeMessageChain,
+)
+from graia.amnesia.message.element import FrozenText, Text, Unknown
 
 
 def test_init():
@@ -26,8 +41,267 @@ def test_replace():
     assert msg.replace([Text("123")], [Text("456")]) == MessageChain([Text("    456"), Unknown("at", {"id": 1})])
 
 
+def test_split():
+    msg = MessageChain(["/cmd  a b", Unknown("at", {}), " c"])
+
+    assert next(msg.iter_split()) == MessageChain(["/cmd"])
+    assert msg.split(maxsplit=1) == [MessageChain(["/cmd"]), MessageChain([" a b", Unknown("at", {}), " c"])]
+    assert msg.rsplit(maxsplit=1) == [MessageChain(["/cmd  a b", Unknown("at", {})]), MessageChain(["c"])]
+    assert msg.split(re.compile(r"\s+")) == msg.split()
+
+
+def test_regex():
+    msg = MessageChain(["/ban ", Unknown("at", {"id": 1}), " 10m"])
+    match = msg.match(r"/ban (\ufffc) (?P<time>\d+)m")
+
+    assert match is not None
+    assert match.group(1) == MessageChain([Unknown("at", {"id": 1})])
+    assert match["time"] == MessageChain(["10"])
+    assert match.locate("time") == ((2, 1), (2, 3))
+    assert msg.search("^/kick") is None
+    assert [m.span() for m in msg.finditer(r"\w+")] == [(1, 4), (7, 10)]
+    assert msg.sub(r"\d+", "N") == MessageChain(["/ban ", Unknown("at", {"id": 1}), " Nm"])
+
+
+def test_view():
+    msg = MessageChain(["/cmd  arg ", Unknown("at", {}), " tail"])
+    view = msg.view().removeprefix("/cmd").lstrip()
+
+    assert isinstance(view, ChainView) and view.is_view
+    assert view.startswith("arg") and str(view[:1]) == "arg "
+    assert view.rstrip("tail ") == msg[:2].removeprefix("/cmd").lstrip()
+    msg.append("!")
+    assert view.materialize() == MessageChain(["arg ", Unknown("at", {}), " tail"])
+    assert view[:1] + "z" == view[:1] + MessageChain(["z"]) == MessageChain(["arg ", "z"])
+    assert "z" + view[:1] + view[1:2] == MessageChain(["z", "arg ", Unknown("at", {})])
+    assert isinstance(("a" + RopeMessageChain(["b"]).view()).materialize(), RopeMessageChain)
+
+
+def test_auto_merge():
+    msg = MessageChain(["a", "b", Unknown("at", {})], merge=True)
+    assert msg == MessageChain(["ab", Unknown("at", {})])
+
+    msg.append("c")
+    msg += MessageChain(["d", "e"])
+    msg.extend(["f"], Unknown("at", {}))
+    assert msg == MessageChain(["ab", Unknown("at", {}), "cdef", Unknown("at", {})])
+    assert msg.merge(copy=False) is msg
+    styled = Text("x", "bold")
+    assert MessageChain([styled, Unknown("at", {})]).merge()[0] is styled
+
+
+def test_element_registry():
+    registry = ElementRegistry()
+
+    @registry.register("text")
+    def _(raw: dict) -> Text:
+        return Text(raw["data"]["text"])
+
+    payload = [{"type": "text", "data": {"text": "hi"}}, {"type": "face", "id": 1}, " there"]
+    assert registry.decode(payload) == MessageChain(["hi", Unknown("face", payload[1]), " there"])
+    assert registry.decode_one(payload[0]) == Text("hi")
+
+
 def test_remove():
     msg = MessageChain([Text("123"), Unknown("at", {"id": 1}), Text("456")])
 
     assert msg.removeprefix("123") == MessageChain([Unknown("at", {"id": 1}), Text("456")])
     assert msg.removesuffix("456") == MessageChain([Text("123"), Unknown("at", {"id": 1})])
+
+
+def test_copy_on_write():
+    msg = MessageChain([Text("  123  "), Unknown("at", {"id": 1})])
+    copied = msg.copy()
+    copied.append("456")
+
+    assert msg == MessageChain([Text("  123  "), Unknown("at", {"id": 1})])
+    assert copied == MessageChain([Text("  123  "), Unknown("at", {"id": 1}), Text("456")])
+    assert msg.strip(" ", Unknown).removeprefix("1") == MessageChain("23")
+    assert msg[0] == Text("  123  ")
+
+    msg.lstrip(copy=False)
+    assert msg[0] == Text("123  ")
+    assert copied[0] == Text("  123  ")
+
+    held = msg.content
+    copied, viewed = msg.copy(), msg.view()
+    held.append(Text("LEAK"))
+    assert str(copied) == str(viewed) == "123  [$Unknown:type=at]"
+
+
+def test_frozen_text():
+    text = FrozenText("123")
+
+    assert text == Text("123") and Text("123") == text
+    assert {text, FrozenText("123")} == {text}
+    assert FrozenText.intern(" ") is FrozenText.intern(" ")
+    assert MessageChain([text, "456"]).merge() == MessageChain("123456")
+
+
+def test_pickle():
+    msg = MessageChain([Text("hi", "bold"), Unknown("at", {"id": 1})])
+    # 元素仍以 `__dict__` 保存属性时的 pickle 数据
+    legacy = (
+        b"\x80\x04\x95\xc8\x00\x00\x00\x00\x00\x00\x00\x8c\x1bgraia.amnesia.message.chain\x94\x8c\x0cMessageChain"
+        b"\x94\x93\x94)\x81\x94}\x94\x8c\x07content\x94]\x94(\x8c\x1dgraia.amnesia.message.element\x94\x8c\x04Text"
+        b"\x94\x93\x94)\x81\x94}\x94(\x8c\x04text\x94\x8c\x02hi\x94\x8c\x05style\x94\x8c\x04bold\x94ubh\x07\x8c"
+        b"\x07Unknown\x94\x93\x94)\x81\x94}\x94(\x8c\x04type\x94\x8c\x02at\x94\x8c\x08raw_data\x94}\x94\x8c\x02id"
+        b"\x94K\x01subesb."
+    )
+    loaded = pickle.loads(legacy)
+
+    assert loaded == msg and str(loaded) == "hi[$Unknown:type=at]" and loaded.has(Unknown)
+    assert pickle.loads(pickle.dumps(msg)) == msg
+    assert pickle.loads(pickle.dumps(FrozenText("x"))) == Text("x")
+
+
+def test_type_query():
+    msg = MessageChain([Text("123"), Unknown("at", {"id": 1}), FrozenText("456"), Unknown("at", {"id": 2})])
+
+    assert msg.get(Text) == [Text("123"), Text("456")]
+    assert msg.get(Unknown, 1) == [Unknown("at", {"id": 1})]
+    assert msg.get_one(Unknown, 1) == Unknown("at", {"id": 2})
+    assert msg.get_first(FrozenText) == Text("456")
+    assert msg.has(FrozenText) and not MessageChain("123").has(FrozenText)
+    assert msg.index(Unknown) == 1 and msg.count(Text) == 2
+    assert msg.only(Text, Unknown) and not msg.only(Text)
+
+    msg.append(Unknown("at", {"id": 3}))
+    assert msg.count(Unknown) == 3
+    msg.rstrip(Unknown, copy=False)
+    assert msg.count(Unknown) == 1 and msg.index(FrozenText) == 2
+
+    held = msg.content
+    assert msg.count(Text) == 2
+    held.append(Unknown("at", {"id": 4}))
+    assert msg.count(Unknown) == 2 and msg.get(Unknown)[-1] == Unknown("at", {"id": 4})
+    held[0] = FrozenText("123")
+    assert msg.get(FrozenText) == [Text("123"), Text("456")] and msg.index(FrozenText) == 0
+
+
+def test_render_cache():
+    msg = MessageChain(["", Text("123")])
+
+    assert msg and str(msg) == "123"
+    msg.append(Unknown("at", {"id": 1}))
+    assert str(msg) == "123[$Unknown:type=at]"
+    msg.content = [Text("")]
+    assert not msg and str(msg) == "" and msg.empty()
+
+    msg = MessageChain(["hello", Unknown("at", {"id": 1})])
+    assert str(msg) == "hello[$Unknown:type=at]" and str(msg) is str(msg) and msg.search("h")
+    view = msg.view()[:1]
+    assert str(view) == "hello" and str(view) is str(view)
+    msg[0].text = "bye"  # type: ignore
+    assert str(msg) == "bye[$Unknown:type=at]" and str(view) == "bye" and not msg.search("h")
+    msg[1].type = "face"  # type: ignore
+    assert str(msg) == "bye[$Unknown:type=face]" and str(msg) is str(msg)
+    frozen = MessageChain([FrozenText("hello")])
+    assert str(frozen) == "hello" and str(frozen) is str(frozen)
+
+
+def test_index_sub():
+    msg = MessageChain(["aaa", Unknown("at", {"id": 1}), Text("ab"), "c", Unknown("at", {"id": 1}), "a"])
+
+    assert msg.index_sub(["aa"]) == [0, 1]
+    assert msg.index_sub(MessageChain("bc")) == [5]
+    assert msg.index_sub(["a", Unknown("at", {"id": 1}), "a"]) == [2]
+    assert msg.index_sub(["c", Unknown("at", {"id": 1})]) == [6]
+    assert msg.index_sub([Unknown("at", {"id": 1}), "abc", Unknown("at", {"id": 1})]) == [3]
+    assert not msg.has(["c", Unknown("at", {"id": 2})])
+
+
+def test_matcher():
+    at = Unknown("at", {"id": 1})
+    matcher = ChainMatcher(["ab", "b", [at, "c"]])
+    msg = MessageChain(["ab", at, "cab"])
+
+    assert matcher.findall(msg) == [(0, 2, 0), (1, 2, 1), (2, 4, 2), (4, 6, 0), (5, 6, 1)]
+    assert matcher.replace(msg, ["x", "y", [Unknown("at", {"id": 2})]]) == MessageChain(
+        ["x", Unknown("at", {"id": 2}), "x"]
+    )
+    assert matcher.search(MessageChain("ccc")) is None
+
+
+def test_replace_many():
+    at = Unknown("at", {"id": 1})
+    msg = MessageChain(["{name} says ", at, at, "{greeting}"])
+
+    assert msg.replace([at], ["@"]) == MessageChain(["{name} says @@{greeting}"])
+    assert msg.replace(["aa"], ["b"]) == msg
+    assert msg.replace_many({"{name}": "Alice", "{greeting}": [at]}) == MessageChain(["Alice says ", at, at, at])
+
+
+def test_formatter():
+    at = Unknown("at", {"id": 1})
+
+    assert Formatter("Hello {0}, {name}!").format(at, name="Bob") == MessageChain([Text("Hello "), at, Text(", Bob!")])
+    assert Formatter("{{}} {} {}").format(MessageChain(["a", at]), "b") == MessageChain(["{} a", at, " b"])
+
+
+def test_lazy_chain():
+    decoded = []
+
+    def decoder(raw: dict):
+        decoded.append(raw)
+        return Text(raw["text"]) if raw["type"] == "text" else Unknown(raw["type"], raw)
+
+    msg = LazyMessageChain([{"type": "text", "text": "/ping "}, {"type": "at", "id": 1}], decoder)
+
+    assert len(msg) == 2 and msg.startswith("/ping") and msg
+    assert len(decoded) == 1 and msg.pending
+    assert msg.removeprefix("/ping").strip() == MessageChain([Unknown("at", {"type": "at", "id": 1})])
+    assert not msg.pending
+
+
+def test_rope_chain():
+    msg = RopeMessageChain([])
+    for i in range(300):
+        msg += MessageChain([f"{i}", Unknown("at", {"id": i})])
+
+    assert len(msg) == 600 and msg[-1] == Unknown("at", {"id": 299})
+    assert msg[2:6].materialize() == MessageChain(["1", Unknown("at", {"id": 1}), "2", Unknown("at", {"id": 2})])
+    assert msg[:4].merge() == MessageChain(["0", Unknown("at", {"id": 0}), "1", Unknown("at", {"id": 1})])
+
+    msg.content.clear()
+    msg.append("end")
+    assert msg == MessageChain("end")
+
+    msg.append("!")
+    held = msg.content
+    held.append(Text("?"))
+    assert str(msg + "~") == "end!?~" and len(msg) == 3
+
+
+def test_codec():
+    codec = ChainCodec()
+    msg = MessageChain([Text("你好", "bold"), Unknown("at", {"id": 1}), FrozenText(" "), "x" * 300])
+
+    assert codec.decode(memoryview(codec.encode(msg))) == msg
+    assert codec.decode_many(codec.encode_many([msg, MessageChain([])])) == [msg, MessageChain([])]
+
+    data = codec.encode(msg)
+    for cut in range(len(data)):
+        with pytest.raises(ValueError):
+            codec.decode(data[:cut])
+    with pytest.raises(ValueError):
+        codec.decode(data + b"\0")
+    with pytest.raises(ValueError):
+        codec.decode_many(codec.encode_many([MessageChain(["hello world"])])[:-4])
+    with pytest.raises(ValueError, match="Unknown"):
+        codec.encode(MessageChain([Unknown("image", {"data": b"\x89PNG"})]))
+
+
+def test_chain_batch():
+    chains = [MessageChain([" /ping "]), MessageChain([Unknown("at", {}), " hi"]), MessageChain([])]
+    batch = ChainBatch(chains)
+
+    assert batch.to_chains() == chains
+    assert batch.render() == [str(chain) for chain in chains]
+    assert batch.has(Unknown) == [False, True, False]
+    stripped = batch.strip()
+    assert stripped.startswith("/") == [True, False, False]
+    assert stripped.filter(stripped.startswith("/")).to_chains() == [MessageChain(["/ping"])]
+    assert stripped.filter([False, True, True]).endswith("hi") == [True, False]
+    assert stripped.startswith("") == [True, False, False]
+    assert batch[0] == chains[0]
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from graia.amnesia.utilles import IdGenerator, PriorityResolver, Registrar, priority_strategy, random_id
+
+
+def test_priority_resolver():
+    items = [{"a": 1, "b": 2}, {"a": 2}, ({"c": 1}, {"b": 2})]
+    resolver = PriorityResolver(lambda item: item, items)  # type: ignore
+
+    assert dict(resolver.mapping) == priority_strategy(items, lambda item: item)  # type: ignore
+    resolver.remove(items[1])
+    assert resolver["a"] is items[0]
+    with pytest.raises(ValueError):
+        resolver.add({"c"})
+    assert resolver["c"] is items[2]
+
+
+def test_random_id():
+    assert len(random_id()) == 12 and random_id(30).isalnum()
+    generator = IdGenerator(4, bulk=16, history=100)
+    ids = [generator() for _ in range(100)]
+    assert len(set(ids)) == 100 and all(len(i) == 4 for i in ids)
+    with pytest.raises(ValueError):
+        IdGenerator(1, history=62)
+    with pytest.raises(ValueError):
+        generator(1)
+    assert len(IdGenerator(2, history=62)(2)) == 2
+
+
+def test_registrar_layers():
+    base = Registrar({"a": 1, "b": 2})
+
+    @base.decorate("table")
+    class Handler:
+        table = {"b": 0, "c": 3}
+
+    assert Handler.table["a"] == 1 and Handler.table["b"] == 2 and Handler.table.get("c") == 3
+    assert "d" not in Handler.table and len(Handler.table) == 3
+    merged = {"b": 2, "c": 3, "a": 1}
+    assert Handler.table == merged and Handler.table.copy() == dict(Handler.table) == {**Handler.table} == merged
+    assert repr(Handler.table) == repr(merged) and Handler.table | {"d": 4} == {**merged, "d": 4}
+    assert json.dumps(Handler.table.flatten()) == json.dumps(merged) and list(reversed(Handler.table)) == [
+        "a",
+        "c",
+        "b",
+    ]
+    frozen = Handler.table.freeze()
+    assert dict(frozen) == {"a": 1, "b": 2, "c": 3}
+    with pytest.raises(RuntimeError):
+        Handler.table.register("d")(4)
+    for mutate in (lambda t: t.update(z=9), lambda t: t.setdefault("z"), lambda t: t.pop("a"), lambda t: t.clear()):
+        with pytest.raises(RuntimeError):
+            mutate(Handler.table)
+    base["z"] = 9
+    assert Handler.table.get("z") is None and Handler.table._lookup()("z") is None and "z" not in Handler.table